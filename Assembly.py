@@ -0,0 +1,99 @@
+from typing import Dict, Iterable, List, Set, Tuple
+
+from Component import Component
+
+
+class Assembly(object):
+    def __init__(self, components: Iterable[Component] = ()):
+        super(Assembly, self).__init__()
+        self.__components: Dict[Component, None] = {}
+        self.__bounds: Dict[Component, List[Tuple[float, float]]] = {}
+        # components edited since the last solve
+        self.__dirty: Set[Component] = set()
+        # bumped on every edit of the assembly or of its components, unlike dirty it is not reset by solve
+        self.__version = 0
+        for component in components:
+            self.add(component)
+
+    def add(self, component: Component):
+        assert isinstance(component, Component), 'Expected a Component'
+        if component in self.__components:
+            return
+        self.__components[component] = None
+        component.add_listener(self.__on_change)
+        self.__dirty.add(component)
+        self.__version += 1
+
+    def remove(self, component: Component):
+        del self.__components[component]
+        component.remove_listener(self.__on_change)
+        self.__bounds.pop(component, None)
+        self.__dirty.discard(component)
+        self.__version += 1
+
+    def close(self):
+        # removes every component, so none of them keeps the listener of this assembly (and the assembly) alive
+        for component in list(self.__components):
+            self.remove(component)
+
+    def __enter__(self) -> 'Assembly':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __on_change(self, component: Component, dependencies_changed: bool):
+        self.__dirty.add(component)
+        self.__version += 1
+
+    @property
+    def dirty(self) -> Set[Component]:
+        return set(self.__dirty)
+
+    @property
+    def version(self) -> int:
+        return self.__version
+
+    @property
+    def components(self):
+        return list(self.__components)
+
+    def __iter__(self):
+        return iter(self.__components)
+
+    def __len__(self):
+        return len(self.__components)
+
+    def __contains__(self, component):
+        return component in self.__components
+
+    def axis_order(self) -> List[Tuple[Component, int]]:
+        # (component, axis) with referenced axes first, two components may reference each other on different axes
+        return sorted(((component, axis) for component in self.__components for axis in range(3)),
+                      key=self.__get_order)
+
+    @staticmethod
+    def __get_order(node: Tuple[Component, int]) -> int:
+        return node[0].get_order(node[1])
+
+    def solve(self) -> List[Component]:
+        # only components edited since the last solve (and their dependents) are re-solved, axis by axis with
+        # referenced axes first, so every reference resolves from an already solved axis
+        # the components keep that order up to date on every edit, so rewiring a reference costs no global sort
+        nodes = sorted(((component, axis) for component in self.__dirty for axis in range(3)), key=self.__get_order)
+        self.__dirty = set()
+        for component, axis in nodes:
+            component.bounds_on_axis(axis)
+        solved = list(dict.fromkeys(component for component, _ in nodes))
+        for component in solved:
+            self.__bounds[component] = component.full_bounds
+        return solved
+
+    @property
+    def bounds(self) -> Dict[Component, List[Tuple[float, float]]]:
+        return dict(self.__bounds)
+
+    def get_bounds(self, component: Component) -> List[Tuple[float, float]]:
+        if component in self.__dirty:
+            self.solve()
+        return self.__bounds[component]
@@ -1,15 +1,27 @@
-from typing import Union, Optional
+from itertools import count
+from typing import Callable, Union, Optional
 
 from Reference import Reference
 
 
 class Component(object):
+    __slots__ = ('_label', '_thickness', '_face', '__user_values', '__offset', '__solved', '__dirty',
+                 '__dependencies', '__dependents', '__listeners', '__references', '__order')
+
+    # every axis of every component gets a position in a topological order of the reference graph
+    # (referenced axes first), kept up to date on each assignment so circular references are rejected right away
+    __next_order = count()
+
     __axis_names = [['left', 'center_x', 'right', 'width'],
                     ['front', 'center_y', 'back', 'depth'],
                     ['bottom', 'center_z', 'top', 'height']]
 
     __axes = ["x", "y", "z"]
 
+    __prop_axes = {'left': 0, 'center_x': 0, 'right': 0, 'width': 0,
+                   'front': 1, 'center_y': 1, 'back': 1, 'depth': 1,
+                   'bottom': 2, 'center_z': 2, 'top': 2, 'height': 2}
+
     __faces = ["side", "front", "top"]
 
     def __init__(self, /, label: str, thickness: Union[int, float], face: str,
@@ -41,6 +53,19 @@ class Component(object):
 
         self.__offset = [0, 0, 0]
 
+        # solved values per axis, cleared whenever this axis or one it depends on changes
+        self.__solved = [None, None, None]
+        self.__dirty = [True, True, True]
+        # per axis: (owner, owner axis) pairs referenced by this axis
+        self.__dependencies = [(), (), ()]
+        # dependent component -> bit (owner axis * 3 + dependent axis) set for every axis pair it references,
+        # allocated on the first dependent
+        self.__dependents = None
+        self.__listeners = ()
+        # bare property references, created on first access and shared afterwards
+        self.__references = None
+        self.__order = [next(Component.__next_order) for _ in range(3)]
+
         if width is not None:
             self.width = width
         if height is not None:
@@ -73,12 +98,32 @@ class Component(object):
     def __repr__(self):
         return f'Piece<{self._label}>'
 
+    @classmethod
+    def get_axis(cls, prop: str):
+        return cls.__prop_axes[prop]
+
+    def add_listener(self, listener: Callable[['Component', bool], None]):
+        self.__listeners = (*self.__listeners, listener)
+
+    def remove_listener(self, listener: Callable[['Component', bool], None]):
+        listeners = list(self.__listeners)
+        listeners.remove(listener)
+        self.__listeners = tuple(listeners)
+
     def __get_reference(self, i: int, j: int):
-        return Reference(self, self.__class__.__axis_names[i][j])
+        if self.__references is None:
+            self.__references = [None] * 12
+        reference = self.__references[i * 4 + j]
+        if reference is None:
+            reference = self.__references[i * 4 + j] = Reference(self, self.__class__.__axis_names[i][j])
+        return reference
 
     def get_user_value(self, i: int, j: int):
         return self.__user_values[i][j]
 
+    def get_offset(self, axis: int):
+        return self.__offset[axis]
+
     def get_conceptual_value(self, i: int, j: int):
         if self.__class__.__faces[i] == self._face and j == 3:
             return self._thickness
@@ -97,6 +142,7 @@ class Component(object):
         # If None, set to None
         if value is None:
             self.__user_values[i][j] = None
+            self.__changed(i)
             return
 
         # assert value is valid
@@ -104,9 +150,10 @@ class Component(object):
         if isinstance(value, (int, float)):
             assert value >= 0, 'Value must be positive'
         else:
-            pass  # TODO: check valid reference / circular reference
+            self.__check_reference(i, value)
 
         self.__user_values[i][j] = value
+        self.__changed(i)
 
         # assert 2 values at max could be set on the same axis
         assert not self.is_conceptually_over_defined_on_axis(i), "Can't set more than 2 constraints on the same axis"
@@ -145,10 +192,133 @@ class Component(object):
     def is_really_well_defined_on_axis(self, axis: int):
         return self.count_real_defined_on_axis(axis) == 2
 
+    def __check_reference(self, axis: int, value: Union[int, float, Reference]):
+        if not isinstance(value, Reference):
+            return
+        for owner, prop in value.get_properties():
+            if isinstance(owner, Component):
+                self.__order_after(axis, owner, owner.get_axis(prop))
+
+    def get_order(self, axis: int) -> int:
+        # position of this axis in the topological order, lower than the positions of the axes depending on it
+        return self.__order[axis]
+
+    def __get_node_label(self, axis: int):
+        return f'{self._label}.{self.__axes[axis]}'
+
+    def __order_after(self, axis: int, owner: 'Component', owner_axis: int):
+        # Pearce-Kelly on the (component, axis) graph: only the nodes ordered between this axis and the
+        # referenced one are visited and reordered, so axes of two components may reference each other
+        if owner is self and owner_axis == axis:
+            raise ValueError(f'Circular reference: {self.__get_node_label(axis)} references itself')
+        lower, upper = self.__order[axis], owner.__order[owner_axis]
+        if upper < lower:
+            return
+
+        target = (owner, owner_axis)
+        forward, parents, stack = [], {(self, axis): None}, [(self, axis)]
+        while stack:
+            node = stack.pop()
+            forward.append(node)
+            component, component_axis = node
+            for dependent, mask in (component.__dependents or {}).items():
+                for dependent_axis in range(3):
+                    if not mask >> (component_axis * 3 + dependent_axis) & 1:
+                        continue
+                    successor = (dependent, dependent_axis)
+                    if successor == target:
+                        path = [target]
+                        while node is not None:
+                            path.append(node)
+                            node = parents[node]
+                        labels = ' -> '.join(c.__get_node_label(a) for c, a in [(self, axis), *path])
+                        raise ValueError(f'Circular reference: {labels}')
+                    if successor not in parents and dependent.__order[dependent_axis] < upper:
+                        parents[successor] = node
+                        stack.append(successor)
+
+        backward, visited, stack = [], {target}, [target]
+        while stack:
+            node = stack.pop()
+            backward.append(node)
+            component, component_axis = node
+            for predecessor in component.__dependencies[component_axis]:
+                predecessor_component, predecessor_axis = predecessor
+                if predecessor not in visited and predecessor_component.__order[predecessor_axis] > lower:
+                    visited.add(predecessor)
+                    stack.append(predecessor)
+
+        # the referenced axis and everything it depends on move in front of this axis and its dependents
+        def get_order(n):
+            return n[0].__order[n[1]]
+
+        nodes = sorted(backward, key=get_order) + sorted(forward, key=get_order)
+        for (component, component_axis), order in zip(nodes, sorted(get_order(n) for n in nodes)):
+            component.__order[component_axis] = order
+
+    def __changed(self, axis: int):
+        dependencies = set()
+        for value in (*self.__user_values[axis], self.__offset[axis]):
+            if isinstance(value, Reference):
+                dependencies.update((owner, owner.get_axis(prop)) for owner, prop in value.get_properties()
+                                    if isinstance(owner, Component))
+
+        old_dependencies = set(self.__dependencies[axis])
+        if dependencies != old_dependencies:
+            for owner, owner_axis in old_dependencies - dependencies:
+                mask = owner.__dependents[self] & ~(1 << (owner_axis * 3 + axis))
+                if mask:
+                    owner.__dependents[self] = mask
+                else:
+                    del owner.__dependents[self]
+            for owner, owner_axis in dependencies - old_dependencies:
+                if owner.__dependents is None:
+                    owner.__dependents = {}
+                owner.__dependents[self] = owner.__dependents.get(self, 0) | 1 << (owner_axis * 3 + axis)
+            self.__dependencies[axis] = tuple(dependencies)
+            for listener in self.__listeners:
+                listener(self, True)
+
+        self.invalidate(axis)
+
+    def invalidate(self, axis: Optional[int] = None):
+        # a dirty axis has no cached values and has already invalidated the axes depending on it
+        stack = [(self, axis)] if axis is not None else [(self, 0), (self, 1), (self, 2)]
+        while stack:
+            component, axis = stack.pop()
+            if component.__dirty[axis]:
+                continue
+            component.__dirty[axis] = True
+            component.__solved[axis] = None
+            for listener in component.__listeners:
+                listener(component, False)
+            if component.__dependents is None:
+                continue
+            for dependent, mask in component.__dependents.items():
+                stack.extend((dependent, dependent_axis) for dependent_axis in range(3)
+                             if mask >> (axis * 3 + dependent_axis) & 1)
+
+    def __get_value(self, axis: int, index: int):
+        self.__dirty[axis] = False
+        if self.__user_values[axis][index] is None and self.is_conceptually_under_defined_on_axis(axis):
+            return None
+        return self.__get_calculated_value(axis, index)
+
     def __get_calculated_value(self, axis: int, index: int):
-        return self.calculated_values_on_axis(axis)[index]
+        return self.__get_calculated_value_tuple(axis)[index]
+
+    def __get_calculated_value_tuple(self, axis: int):
+        values = self.__solved[axis]
+        if values is None:
+            values = self.__calculate_values_on_axis(axis)
+            self.__dirty[axis] = False
+            self.__solved[axis] = values = tuple(values)
+        return values
 
     def calculated_values_on_axis(self, axis: int):
+        return [*self.__get_calculated_value_tuple(axis)]
+
+    def __calculate_values_on_axis(self, axis: int):
         values = [self.get_real_value(axis, i) for i in range(4)]
         count_values = sum(1 for value in values if value is not None)
         if count_values < 2:
@@ -183,9 +353,13 @@ class Component(object):
             values[1] = (values[0] + values[2]) / 2
             values[3] = values[2] - values[0]
 
-        values[0] += self.__offset[axis]
-        values[1] += self.__offset[axis]
-        values[2] += self.__offset[axis]
+        # moves by a reference (e.g. move_up(gap.value)) keep the reference, it is resolved here like the values
+        offset = self.__offset[axis]
+        if isinstance(offset, Reference):
+            offset = offset.value
+        values[0] += offset
+        values[1] += offset
+        values[2] += offset
 
         return values
 
@@ -226,8 +400,10 @@ class Component(object):
         return [self.calculated_values_on_axis(i) for i in range(3)]
 
     def to_scad(self):
-        return f'translate([{self.center_x_value}, {self.center_y_value}, {self.center_z_value}])\n' \
-               f'   cube([{self.width_value}, {self.depth_value}, {self.height_value}], center=true);'
+        (_, center_x, _, width), (_, center_y, _, depth), (_, center_z, _, height) = \
+            [self.__get_calculated_value_tuple(axis) for axis in range(3)]
+        return f'translate([{center_x}, {center_y}, {center_z}])\n' \
+               f'   cube([{width}, {depth}, {height}], center=true);'
 
     def bounds_on_axis(self, axis: int):
         values = self.calculated_values_on_axis(axis)
@@ -259,9 +435,7 @@ class Component(object):
 
     @property
     def left_value(self):
-        if self.__user_values[0][0] is None and self.is_conceptually_under_defined_on_axis(0):
-            return None
-        return self.__get_calculated_value(0, 0)
+        return self.__get_value(0, 0)
 
     @property
     def center_x(self):
@@ -273,9 +447,7 @@ class Component(object):
 
     @property
     def center_x_value(self):
-        if self.__user_values[0][1] is None and self.is_conceptually_under_defined_on_axis(0):
-            return None
-        return self.__get_calculated_value(0, 1)
+        return self.__get_value(0, 1)
 
     @property
     def right(self):
@@ -287,9 +459,7 @@ class Component(object):
 
     @property
     def right_value(self):
-        if self.__user_values[0][2] is None and self.is_conceptually_under_defined_on_axis(0):
-            return None
-        return self.__get_calculated_value(0, 2)
+        return self.__get_value(0, 2)
 
     @property
     def width(self):
@@ -301,9 +471,7 @@ class Component(object):
 
     @property
     def width_value(self):
-        if self.__user_values[0][3] is None and self.is_conceptually_under_defined_on_axis(0):
-            return None
-        return self.__get_calculated_value(0, 3)
+        return self.__get_value(0, 3)
 
     @property
     def front(self):
@@ -315,9 +483,7 @@ class Component(object):
 
     @property
     def front_value(self):
-        if self.__user_values[1][0] is None and self.is_conceptually_under_defined_on_axis(1):
-            return None
-        return self.__get_calculated_value(1, 0)
+        return self.__get_value(1, 0)
 
     @property
     def center_y(self):
@@ -329,9 +495,7 @@ class Component(object):
 
     @property
     def center_y_value(self):
-        if self.__user_values[1][1] is None and self.is_conceptually_under_defined_on_axis(1):
-            return None
-        return self.__get_calculated_value(1, 1)
+        return self.__get_value(1, 1)
 
     @property
     def back(self):
@@ -343,9 +507,7 @@ class Component(object):
 
     @property
     def back_value(self):
-        if self.__user_values[1][2] is None and self.is_conceptually_under_defined_on_axis(1):
-            return None
-        return self.__get_calculated_value(1, 2)
+        return self.__get_value(1, 2)
 
     @property
     def depth(self):
@@ -357,9 +519,7 @@ class Component(object):
 
     @property
     def depth_value(self):
-        if self.__user_values[1][3] is None and self.is_conceptually_under_defined_on_axis(1):
-            return None
-        return self.__get_calculated_value(1, 3)
+        return self.__get_value(1, 3)
 
     @property
     def bottom(self):
@@ -371,9 +531,7 @@ class Component(object):
 
     @property
     def bottom_value(self):
-        if self.__user_values[2][0] is None and self.is_conceptually_under_defined_on_axis(2):
-            return None
-        return self.__get_calculated_value(2, 0)
+        return self.__get_value(2, 0)
 
     @property
     def center_z(self):
@@ -385,9 +543,7 @@ class Component(object):
 
     @property
     def center_z_value(self):
-        if self.__user_values[2][1] is None and self.is_conceptually_under_defined_on_axis(2):
-            return None
-        return self.__get_calculated_value(2, 1)
+        return self.__get_value(2, 1)
 
     @property
     def top(self):
@@ -399,9 +555,7 @@ class Component(object):
 
     @property
     def top_value(self):
-        if self.__user_values[2][2] is None and self.is_conceptually_under_defined_on_axis(2):
-            return None
-        return self.__get_calculated_value(2, 2)
+        return self.__get_value(2, 2)
 
     @property
     def height(self):
@@ -413,84 +567,118 @@ class Component(object):
 
     @property
     def height_value(self):
-        if self.__user_values[2][3] is None and self.is_conceptually_under_defined_on_axis(2):
-            return None
-        return self.__get_calculated_value(2, 3)
+        return self.__get_value(2, 3)
 
     def move_left(self, value: Union[int, float, Reference]):
+        self.__check_reference(0, value)
         self.__offset[0] -= value
+        self.__changed(0)
 
     def move_right(self, value: Union[int, float, Reference]):
+        self.__check_reference(0, value)
         self.__offset[0] += value
+        self.__changed(0)
 
     def grow_left(self, value: Union[int, float, Reference]):
         if self.__user_values[0][0] is None:
             raise ValueError("Can't grow left if left is not set")
+        self.__check_reference(0, value)
         self.__user_values[0][0] -= value
+        self.__changed(0)
 
     def shrink_left(self, value: Union[int, float, Reference]):
         if self.__user_values[0][0] is None:
             raise ValueError("Can't shrink left if left is not set")
+        self.__check_reference(0, value)
         self.__user_values[0][0] += value
+        self.__changed(0)
 
     def grow_right(self, value: Union[int, float, Reference]):
         if self.__user_values[0][2] is None:
             raise ValueError("Can't grow right if right is not set")
+        self.__check_reference(0, value)
         self.__user_values[0][2] += value
+        self.__changed(0)
 
     def shrink_right(self, value: Union[int, float, Reference]):
         if self.__user_values[0][2] is None:
             raise ValueError("Can't shrink right if right is not set")
+        self.__check_reference(0, value)
         self.__user_values[0][2] -= value
+        self.__changed(0)
 
     def move_forward(self, value: Union[int, float, Reference]):
+        self.__check_reference(1, value)
         self.__offset[1] -= value
+        self.__changed(1)
 
     def move_backward(self, value: Union[int, float, Reference]):
+        self.__check_reference(1, value)
         self.__offset[1] += value
+        self.__changed(1)
 
     def grow_front(self, value: Union[int, float, Reference]):
         if self.__user_values[1][0] is None:
             raise ValueError("Can't grow front if front is not set")
+        self.__check_reference(1, value)
         self.__user_values[1][0] -= value
+        self.__changed(1)
 
     def shrink_front(self, value: Union[int, float, Reference]):
         if self.__user_values[1][0] is None:
             raise ValueError("Can't shrink front if front is not set")
+        self.__check_reference(1, value)
         self.__user_values[1][0] += value
+        self.__changed(1)
 
     def grow_back(self, value: Union[int, float, Reference]):
         if self.__user_values[1][2] is None:
             raise ValueError("Can't grow back if back is not set")
+        self.__check_reference(1, value)
         self.__user_values[1][2] += value
+        self.__changed(1)
 
     def shrink_back(self, value: Union[int, float, Reference]):
         if self.__user_values[1][2] is None:
             raise ValueError("Can't shrink back if back is not set")
+        self.__check_reference(1, value)
         self.__user_values[1][2] -= value
+        self.__changed(1)
 
     def move_down(self, value: Union[int, float, Reference]):
+        self.__check_reference(2, value)
         self.__offset[2] -= value
+        self.__changed(2)
 
     def move_up(self, value: Union[int, float, Reference]):
+        self.__check_reference(2, value)
         self.__offset[2] += value
+        self.__changed(2)
 
     def grow_bottom(self, value: Union[int, float, Reference]):
         if self.__user_values[2][0] is None:
             raise ValueError("Can't grow bottom if bottom is not set")
+        self.__check_reference(2, value)
         self.__user_values[2][0] -= value
+        self.__changed(2)
 
     def shrink_bottom(self, value: Union[int, float, Reference]):
         if self.__user_values[2][0] is None:
             raise ValueError("Can't shrink bottom if bottom is not set")
+        self.__check_reference(2, value)
         self.__user_values[2][0] += value
+        self.__changed(2)
 
     def grow_top(self, value: Union[int, float, Reference]):
         if self.__user_values[2][2] is None:
             raise ValueError("Can't grow top if top is not set")
+        self.__check_reference(2, value)
         self.__user_values[2][2] += value
+        self.__changed(2)
 
     def shrink_top(self, value: Union[int, float, Reference]):
         if self.__user_values[2][2] is None:
             raise ValueError("Can't shrink top if top is not set")
+        self.__check_reference(2, value)
         self.__user_values[2][2] -= value
+        self.__changed(2)
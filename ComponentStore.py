@@ -0,0 +1,517 @@
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from Component import Component
+from Reference import Reference
+
+AXIS_NAMES = [['left', 'center_x', 'right', 'width'],
+              ['front', 'center_y', 'back', 'depth'],
+              ['bottom', 'center_z', 'top', 'height']]
+
+FACES = ["side", "front", "top"]
+
+# property -> axis * 4 + j, the slot of the property within its component
+PROPERTY_SLOTS = {prop: axis * 4 + j for axis, names in enumerate(AXIS_NAMES) for j, prop in enumerate(names)}
+
+
+def solve_axes(values: np.ndarray, defined: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    # values: (..., 4) as [left, center, right, width] of each axis, defined: same shape, offsets: values.shape[:-1]
+    # mirrors Component.calculated_values_on_axis for every component and axis at once
+    values = np.where(defined, values, np.nan)
+    count = defined.sum(axis=-1)
+    if np.any(count > 2):
+        raise ValueError("More than 2 values defined on axis")
+
+    d0, d1, d2, d3 = defined[..., 0], defined[..., 1], defined[..., 2], defined[..., 3]
+    v0, v1, v2, v3 = values[..., 0], values[..., 1], values[..., 2], values[..., 3]
+
+    with np.errstate(invalid='ignore'):
+        width_from_center = np.where(d0, (v1 - v0) * 2, (v2 - v1) * 2)
+        width = np.where(d3, v3, np.where(d0 & d2, v2 - v0, width_from_center))
+        left = np.where(d0, v0, np.where(d1 & ~d2, v1 - width / 2, v2 - width))
+        center = np.where(d1, v1, np.where(d0, np.where(d2, (v2 + v0) / 2, v0 + width / 2), v2 - width / 2))
+        right = np.where(d2, v2, np.where(d0, v0 + width, v1 + width / 2))
+
+        swap = left > right
+        left, right = np.where(swap, right, left), np.where(swap, left, right)
+        center = np.where(swap, (left + right) / 2, center)
+        width = np.where(swap, right - left, width)
+
+        offsets = np.asarray(offsets, dtype=float)
+        solved = np.stack([left + offsets, center + offsets, right + offsets, width], axis=-1)
+
+    # under defined axes keep their raw values, exactly like the scalar solver
+    return np.where((count == 2)[..., None], solved, values)
+
+
+class ComponentStore(object):
+    def __init__(self, capacity: int = 16):
+        super(ComponentStore, self).__init__()
+        self.__size = 0
+        self.__labels: List[str] = []
+        self.__values = np.full((capacity, 3, 4), np.nan)
+        self.__defined = np.zeros((capacity, 3, 4), dtype=bool)
+        self.__offsets = np.zeros((capacity, 3))
+        self.__thickness = np.zeros(capacity)
+        self.__faces = np.zeros(capacity, dtype=np.int8)
+        # slots holding a Reference instead of a number, keyed by (index, axis, j) / (index, axis)
+        self.__references: Dict[Tuple[int, int, int], Reference] = {}
+        self.__offset_references: Dict[Tuple[int, int], Reference] = {}
+        self.__indices: Dict[object, int] = {}
+        self.__views: List[Optional['ComponentView']] = []
+        self.__solved: Optional[np.ndarray] = None
+        self.__exposed: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_components(cls, components: Iterable[Component]) -> 'ComponentStore':
+        # the components were validated on assignment, so their slots are gathered in lists and written to the
+        # arrays at once instead of one numpy write per slot
+        components = list(components)
+        n = len(components)
+        store = cls(capacity=max(n, 1))
+        store.__size = n
+        store.__labels = [component.label for component in components]
+        store.__views = [None] * n
+        store.__indices.update(zip(components, range(n)))
+        faces = np.array([FACES.index(component.face) for component in components], dtype=np.int8)
+        store.__faces[:n] = faces
+        store.__thickness[:n] = [component.thickness for component in components]
+
+        # the conceptual values hold the thickness in the size slot of the face axis, like the store
+        slots = [value for component in components for values in component.conceptual_values for value in values]
+        offsets = [component.get_offset(i) for component in components for i in range(3)]
+        is_reference = [isinstance(value, Reference) for value in slots]
+        reference_slots = np.flatnonzero(is_reference)
+        store.__references = dict(zip(zip((reference_slots // 12).tolist(), (reference_slots // 4 % 3).tolist(),
+                                          (reference_slots % 4).tolist()),
+                                      [slots[slot] for slot in reference_slots.tolist()]))
+        store.__offset_references = {(slot // 3, slot % 3): value for slot, value in enumerate(offsets)
+                                     if isinstance(value, Reference)}
+        store.__values[:n] = np.array([np.nan if value is None or reference else value
+                                       for value, reference in zip(slots, is_reference)], dtype=float).reshape(n, 3, 4)
+        store.__defined[:n] = np.array([value is not None for value in slots], dtype=bool).reshape(n, 3, 4)
+        store.__offsets[:n] = np.array([0 if isinstance(value, Reference) else value for value in offsets],
+                                       dtype=float).reshape(n, 3)
+        return store
+
+    def add(self, label: str, thickness: Union[int, float], face: str,
+            **values: Optional[Union[int, float, Reference]]) -> 'ComponentView':
+        index = self.__append(label, thickness, face)
+        view = self.view(index)
+        for prop, value in values.items():
+            if value is not None:
+                setattr(view, prop, value)
+        return view
+
+    def __append(self, label: str, thickness: Union[int, float], face: str) -> int:
+        assert thickness > 0, 'Thickness must be positive'
+        assert face in FACES, 'Face must be side, top or front'
+        if self.__size == len(self.__thickness):
+            self.__grow(max(2 * self.__size, 16))
+        index = self.__size
+        self.__size += 1
+        self.__labels.append(label)
+        self.__views.append(None)
+        self.__thickness[index] = thickness
+        self.__faces[index] = FACES.index(face)
+        self.__defined[index, FACES.index(face), 3] = True
+        self.__values[index, FACES.index(face), 3] = thickness
+        self.__solved = None
+        return index
+
+    def __grow(self, capacity: int):
+        size = self.__size
+
+        def resized(array, fill):
+            grown = np.full((capacity, *array.shape[1:]), fill, dtype=array.dtype)
+            grown[:size] = array[:size]
+            return grown
+
+        self.__values = resized(self.__values, np.nan)
+        self.__defined = resized(self.__defined, False)
+        self.__offsets = resized(self.__offsets, 0)
+        self.__thickness = resized(self.__thickness, 0)
+        self.__faces = resized(self.__faces, 0)
+
+    def __len__(self):
+        return self.__size
+
+    def __iter__(self):
+        return (self.view(index) for index in range(self.__size))
+
+    def view(self, index: int) -> 'ComponentView':
+        view = self.__views[index]
+        if view is None:
+            view = self.__views[index] = ComponentView(self, index)
+            self.__indices[view] = index
+        return view
+
+    def index_of(self, owner) -> Optional[int]:
+        return self.__indices.get(owner)
+
+    def get_label(self, index: int) -> str:
+        return self.__labels[index]
+
+    def get_thickness(self, index: int) -> float:
+        return float(self.__thickness[index])
+
+    def get_face(self, index: int) -> str:
+        return FACES[self.__faces[index]]
+
+    def get_user_value(self, index: int, axis: int, j: int):
+        if (index, axis, j) in self.__references:
+            return self.__references[(index, axis, j)]
+        if self.__faces[index] == axis and j == 3 or not self.__defined[index, axis, j]:
+            return None
+        return float(self.__values[index, axis, j])
+
+    def get_offset(self, index: int, axis: int):
+        if (index, axis) in self.__offset_references:
+            return self.__offset_references[(index, axis)]
+        return float(self.__offsets[index, axis])
+
+    def set_user_value(self, index: int, axis: int, j: int, value: Optional[Union[int, float, Reference]]):
+        if j == 3 and self.__faces[index] == axis:
+            raise NotImplementedError("Unable to set this value on the selected component face")
+        assert value is None or isinstance(value, (int, float, Reference)), \
+            "Expected value to be int, float, or Reference"
+        if isinstance(value, (int, float)):
+            assert value >= 0, 'Value must be positive'
+        self.__set(index, axis, j, value)
+        assert self.__defined[index, axis].sum() <= 2, "Can't set more than 2 constraints on the same axis"
+
+    def __set(self, index: int, axis: int, j: int, value: Optional[Union[int, float, Reference]]):
+        if j == 3 and self.__faces[index] == axis:
+            return
+        self.__references.pop((index, axis, j), None)
+        if isinstance(value, Reference):
+            self.__references[(index, axis, j)] = value
+            self.__values[index, axis, j] = np.nan
+        elif value is not None:
+            self.__values[index, axis, j] = value
+        else:
+            self.__values[index, axis, j] = np.nan
+        self.__defined[index, axis, j] = value is not None
+        self.__solved = None
+
+    def set_offset(self, index: int, axis: int, value: Union[int, float, Reference]):
+        self.__set_offset(index, axis, value)
+
+    def __set_offset(self, index: int, axis: int, value: Union[int, float, Reference]):
+        self.__offset_references.pop((index, axis), None)
+        if isinstance(value, Reference):
+            self.__offset_references[(index, axis)] = value
+            self.__offsets[index, axis] = 0
+        else:
+            self.__offsets[index, axis] = value
+        self.__solved = None
+
+    def move(self, index: int, axis: int, value: Union[int, float]):
+        if (index, axis) in self.__offset_references:
+            self.__set_offset(index, axis, self.__offset_references[(index, axis)] + value)
+        else:
+            self.__offsets[index, axis] += value
+            self.__solved = None
+
+    def __compile(self, reference: Reference) -> Optional[Tuple[int, float, float]]:
+        # reduce `owner.prop` followed by numeric + - * ops to `scale * source + shift`
+        index = self.__indices.get(reference.owner)
+        if index is None:
+            return None
+        scale, shift = 1.0, 0.0
+        for op, other in reference.ops:
+            if isinstance(other, Reference) or op == '_':
+                return None
+            if op == '+':
+                shift += other
+            elif op == '-':
+                scale, shift = -scale, other - shift
+            elif op == '*':
+                scale, shift = scale * other, shift * other
+        return index * 12 + PROPERTY_SLOTS[reference.prop], scale, shift
+
+    def __evaluate(self, value, exposed: np.ndarray):
+        # same arithmetic as Reference.value, reading store members from the partially solved matrix
+        if not isinstance(value, Reference):
+            return value
+        index = self.__indices.get(value.owner)
+        if index is None:
+            result = value.owner_value
+        else:
+            axis = Component.get_axis(value.prop)
+            result = exposed[index, axis, AXIS_NAMES[axis].index(value.prop)]
+            result = None if np.isnan(result) else float(result)
+        if result is None:
+            return None
+        for op, other in value.ops:
+            other_value = self.__evaluate(other, exposed)
+            if op == '+':
+                result = result + other_value
+            elif op == '-':
+                result = other_value - result
+            elif op == '*':
+                result = result * other_value
+            elif op == '_':
+                result = other_value / result
+        return result
+
+    def __get_label(self, node: int) -> str:
+        return f'{self.__labels[node // 3]}.{"xyz"[node % 3]}'
+
+    def __get_nodes(self, reference: Reference) -> set:
+        # the (index * 3 + axis) nodes of the store members referenced by the expression
+        return {self.__indices[owner] * 3 + Component.get_axis(prop) for owner, prop in reference.get_properties()
+                if owner in self.__indices}
+
+    def __levels(self, dependents: np.ndarray, owners: np.ndarray, node_count: int) -> np.ndarray:
+        # Kahn by levels over the edges owner -> dependent: every round takes all the nodes left without owners,
+        # so the number of rounds is the depth of the references, not the number of nodes
+        order = np.argsort(owners, kind='stable')
+        sorted_dependents = dependents[order]
+        starts = np.searchsorted(owners[order], np.arange(node_count + 1))
+        in_degree = np.bincount(dependents, minlength=node_count)
+        levels = np.zeros(node_count, dtype=np.int64)
+        frontier = np.flatnonzero(in_degree == 0)
+        visited, level = len(frontier), 0
+        while len(frontier):
+            counts = starts[frontier + 1] - starts[frontier]
+            edges = np.repeat(starts[frontier] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            reached = sorted_dependents[edges]
+            np.subtract.at(in_degree, reached, 1)
+            frontier = np.unique(reached[in_degree[reached] == 0])
+            level += 1
+            levels[frontier] = level
+            visited += len(frontier)
+        if visited != node_count:
+            remaining = [self.__get_label(node) for node in np.flatnonzero(in_degree > 0)]
+            raise ValueError(f'Circular reference between {", ".join(remaining)}')
+        return levels
+
+    def __collapse(self, links: np.ndarray, node_values: np.ndarray, node_defined: np.ndarray,
+                   node_offsets: np.ndarray) -> np.ndarray:
+        # an axis set by a single link and a constant size moves with its source: its left, center and right are
+        # the linked value plus a constant, so a link reading them can read the source of that link instead
+        # links are rewired by pointer jumping to the first source that is not such an axis, rows of cabinets
+        # chained end to end then take a few levels instead of one per cabinet
+        if not len(links):
+            return links
+        target, source = links[:, 0].astype(np.int64), links[:, 1].astype(np.int64)
+        scale, shift = links[:, 2].copy(), links[:, 3].copy()
+        node_count = len(node_values)
+        link_of_node = np.full(node_count, -1, dtype=np.int64)
+        link_of_node[target // 4] = np.arange(len(links))
+        offset_references = np.zeros(node_count, dtype=bool)
+        offset_references[[index * 3 + axis for index, axis in self.__offset_references]] = True
+        with np.errstate(invalid='ignore'):
+            sized = (node_defined.sum(axis=-1) == 2) & node_defined[:, 3] & (node_values[:, 3] >= 0)
+        affine = sized & (np.bincount(target // 4, minlength=node_count) == 1) & ~offset_references
+        affine[target[target % 4 == 3] // 4] = False
+
+        # exposed[source] = values[target of parent] + step, for the left, center or right of an affine axis
+        source_node, source_slot = source // 4, source % 4
+        parent = np.where(affine[source_node] & (source_slot != 3), link_of_node[source_node], -1)
+        linked_slot = target[np.maximum(parent, 0)] % 4
+        positions = np.array([0, 0.5, 1, 0])
+        step = (positions[source_slot] - positions[linked_slot]) * node_values[source_node, 3] + \
+            node_offsets[source_node]
+        # a cycle of links never reaches a root, it is left to the level ordering to report it
+        for _ in range(max(len(links), 1).bit_length() + 1):
+            jumping = np.flatnonzero(parent >= 0)
+            if not len(jumping):
+                break
+            previous = parent[jumping]
+            shift[jumping] = scale[jumping] * (shift[previous] + step[jumping]) + shift[jumping]
+            scale[jumping] = scale[jumping] * scale[previous]
+            source[jumping], step[jumping], parent[jumping] = source[previous], step[previous], parent[previous]
+        else:
+            return links
+        return np.stack([target, source, scale, shift], axis=-1).astype(float)
+
+    def solve(self) -> np.ndarray:
+        if self.__solved is not None:
+            return self.__solved
+        n = self.__size
+        values = self.__values[:n].copy()
+        defined = self.__defined[:n]
+        offsets = self.__offsets[:n].copy()
+
+        # every (index, axis) is a node of its own, so an axis may reference another axis of the same component
+        links = []  # affine links: target flat slot, source flat slot, scale, shift
+        generic = []  # (index, axis, j or None, reference) evaluated one by one
+        generic_edges = []  # (dependent node, owner node) of the generic references
+        # references are hash-consed, so shared expressions are only compiled once
+        compiled_references = {reference: self.__compile(reference) for reference in set(self.__references.values())}
+        for (index, axis, j), reference in self.__references.items():
+            compiled = compiled_references[reference]
+            if compiled is not None:
+                links.append((index * 12 + axis * 4 + j, *compiled))
+            else:
+                generic.append((index, axis, j, reference))
+                generic_edges.extend((index * 3 + axis, owner) for owner in self.__get_nodes(reference))
+        for (index, axis), reference in self.__offset_references.items():
+            generic.append((index, axis, None, reference))
+            generic_edges.extend((index * 3 + axis, owner) for owner in self.__get_nodes(reference))
+
+        link_array = self.__collapse(np.array(links, dtype=float).reshape(-1, 4), values.reshape(-1, 4),
+                                     defined.reshape(-1, 4), offsets.reshape(-1))
+        edges = np.concatenate([link_array[:, :2].astype(np.int64) // 4,
+                                np.array(generic_edges, dtype=np.int64).reshape(-1, 2)])
+        levels = self.__levels(edges[:, 0], edges[:, 1], n * 3)
+        node_values = values.reshape(-1, 4)
+        node_defined = defined.reshape(-1, 4)
+        node_offsets = offsets.reshape(-1)
+        # like the *_value properties: unset slots of under defined axes read as None, the thickness is not a user value
+        user_defined = defined.copy()
+        user_defined[np.arange(n), self.__faces[:n], 3] = False
+        user_defined = user_defined.reshape(-1, 4)
+        solved = np.full((n * 3, 4), np.nan)
+        exposed = np.full((n * 3, 4), np.nan)
+        flat_values = values.reshape(-1)
+        flat_exposed = exposed.reshape(-1)
+
+        link_array = link_array[np.argsort(levels[link_array[:, 0].astype(np.int64) // 4], kind='stable')]
+        link_target = link_array[:, 0].astype(np.int64)
+        link_source = link_array[:, 1].astype(np.int64)
+        generic_by_level: Dict[int, list] = {}
+        for item in generic:
+            generic_by_level.setdefault(int(levels[item[0] * 3 + item[1]]), []).append(item)
+
+        # axes and links grouped by level, each level only reads from the ones before it
+        level_count = int(levels.max(initial=0)) + 1
+        node_order = np.argsort(levels, kind='stable')
+        node_bounds = np.searchsorted(levels[node_order], np.arange(level_count + 1))
+        link_bounds = np.searchsorted(levels[link_target // 4], np.arange(level_count + 1))
+
+        for level in range(level_count):
+            nodes = node_order[node_bounds[level]:node_bounds[level + 1]]
+            selected = slice(link_bounds[level], link_bounds[level + 1])
+            flat_values[link_target[selected]] = \
+                flat_exposed[link_source[selected]] * link_array[selected, 2] + link_array[selected, 3]
+            for index, axis, j, reference in generic_by_level.get(level, ()):
+                value = self.__evaluate(reference, exposed.reshape(n, 3, 4))
+                if j is None:
+                    offsets[index, axis] = np.nan if value is None else value
+                else:
+                    values[index, axis, j] = np.nan if value is None else value
+
+            real_defined = node_defined[nodes] & ~np.isnan(node_values[nodes])
+            solved[nodes] = solve_axes(node_values[nodes], real_defined, node_offsets[nodes])
+            under_defined = node_defined[nodes].sum(axis=-1, keepdims=True) < 2
+            exposed[nodes] = np.where(under_defined & ~user_defined[nodes], np.nan, solved[nodes])
+
+        self.__solved = solved.reshape(n, 3, 4)
+        self.__exposed = exposed.reshape(n, 3, 4)
+        return self.__solved
+
+    @property
+    def values(self) -> np.ndarray:
+        self.solve()
+        return self.__exposed
+
+    @property
+    def bounds(self) -> np.ndarray:
+        return self.solve()[:, :, [0, 2]]
+
+    def get_value(self, index: int, axis: int, j: int) -> Optional[float]:
+        value = self.values[index, axis, j]
+        return None if np.isnan(value) else float(value)
+
+    def calculated_values_on_axis(self, index: int, axis: int) -> list:
+        return [None if np.isnan(value) else float(value) for value in self.solve()[index, axis]]
+
+
+def _value_property(axis: int, j: int):
+    return property(lambda self: self.store.get_value(self.index, axis, j))
+
+
+def _reference_property(axis: int, j: int):
+    def getter(self):
+        return Reference(self, AXIS_NAMES[axis][j])
+
+    def setter(self, value: Optional[Union[int, float, Reference]]):
+        self.store.set_user_value(self.index, axis, j, value)
+
+    return property(getter, setter)
+
+
+class ComponentView(object):
+    def __init__(self, store: ComponentStore, index: int):
+        super(ComponentView, self).__init__()
+        self.store = store
+        self.index = index
+
+    @property
+    def label(self):
+        return self.store.get_label(self.index)
+
+    @property
+    def thickness(self):
+        return self.store.get_thickness(self.index)
+
+    @property
+    def face(self):
+        return self.store.get_face(self.index)
+
+    def __repr__(self):
+        return f'Piece<{self.label}>'
+
+    def get_user_value(self, i: int, j: int):
+        return self.store.get_user_value(self.index, i, j)
+
+    def get_offset(self, axis: int):
+        return self.store.get_offset(self.index, axis)
+
+    def calculated_values_on_axis(self, axis: int):
+        return self.store.calculated_values_on_axis(self.index, axis)
+
+    @property
+    def calculated_values(self):
+        return [self.calculated_values_on_axis(i) for i in range(3)]
+
+    def to_scad(self):
+        return f'translate([{self.center_x_value}, {self.center_y_value}, {self.center_z_value}])\n' \
+               f'   cube([{self.width_value}, {self.depth_value}, {self.height_value}], center=true);'
+
+    def bounds_on_axis(self, axis: int):
+        values = self.calculated_values_on_axis(axis)
+        return values[0], values[2]
+
+    @property
+    def full_bounds(self):
+        return [self.bounds_on_axis(i) for i in range(3)]
+
+    def bounds_on_face(self, from_face: str = None):
+        assert from_face is None or from_face in ("side", "top", "front"), 'Face must be side, top or front'
+        selected_face = from_face if from_face is not None else self.face
+        if selected_face == "side":
+            return self.bounds_on_axis(1), self.bounds_on_axis(2)
+        elif selected_face == "top":
+            return self.bounds_on_axis(0), self.bounds_on_axis(1)
+        return self.bounds_on_axis(0), self.bounds_on_axis(2)
+
+    def move_left(self, value: Union[int, float]):
+        self.store.move(self.index, 0, -value)
+
+    def move_right(self, value: Union[int, float]):
+        self.store.move(self.index, 0, value)
+
+    def move_forward(self, value: Union[int, float]):
+        self.store.move(self.index, 1, -value)
+
+    def move_backward(self, value: Union[int, float]):
+        self.store.move(self.index, 1, value)
+
+    def move_down(self, value: Union[int, float]):
+        self.store.move(self.index, 2, -value)
+
+    def move_up(self, value: Union[int, float]):
+        self.store.move(self.index, 2, value)
+
+    left, center_x, right, width = (_reference_property(0, j) for j in range(4))
+    front, center_y, back, depth = (_reference_property(1, j) for j in range(4))
+    bottom, center_z, top, height = (_reference_property(2, j) for j in range(4))
+
+    left_value, center_x_value, right_value, width_value = (_value_property(0, j) for j in range(4))
+    front_value, center_y_value, back_value, depth_value = (_value_property(1, j) for j in range(4))
+    bottom_value, center_z_value, top_value, height_value = (_value_property(2, j) for j in range(4))
@@ -0,0 +1,30 @@
+from typing import Union
+
+from Reference import Reference
+
+
+class Parameter(object):
+    # a named design value that components can reference like one of their own properties:
+    # `width.value` is a Reference usable in any expression, `width.value_value` its current number
+    __slots__ = ('_label', '_value', '_reference', '__weakref__')
+
+    def __init__(self, /, label: str, value: Union[int, float]):
+        super(Parameter, self).__init__()
+        self._label = label
+        self._value = value
+        self._reference = Reference(self, 'value')
+
+    @property
+    def label(self):
+        return self._label
+
+    @property
+    def value(self):
+        return self._reference
+
+    @property
+    def value_value(self):
+        return self._value
+
+    def __repr__(self):
+        return f'Parameter<{self._label}>'
@@ -0,0 +1,149 @@
+from typing import Dict, Iterable, List, Optional, Set, TextIO, Tuple, Union
+
+from Assembly import Assembly
+from collision import find_collisions
+from Component import Component
+from contacts import build_contact_graph, find_invalid_corners
+from dxf_writer import iter_dxf_cutout_lines
+from instrumentation import instrumentation
+from joints import Joint, detect_joints
+from scad_writer import iter_scad_cutout_lines
+from svg_writer import (PanelCutouts, get_panel_cutouts, iter_svg_cutout_lines, iter_svg_fragments_parallel,
+                        write_lines)
+
+STAGES = ['solve', 'collide', 'joints', 'fingers', 'render']
+
+OUTPUT_FORMATS = ['svg', 'dxf', 'scad']
+
+
+class Pipeline(object):
+    # solve -> collide -> joints -> fingers -> render, the output of every stage but render is kept until
+    # invalidated, so rendering again (e.g. to another format) does not redo the geometry
+    # editing a component of the assembly invalidates everything from solve on
+    # a pipeline built from components owns its assembly: close it (or use it as a context manager) once done,
+    # otherwise the components keep the listener of the assembly
+    def __init__(self, assembly: Union[Assembly, Iterable[Component]]):
+        super(Pipeline, self).__init__()
+        self.__owns_assembly = not isinstance(assembly, Assembly)
+        self.__assembly = Assembly(assembly) if self.__owns_assembly else assembly
+        self.__outputs: Dict[str, object] = {}
+        # version of the assembly the cached outputs were computed from
+        self.__version = self.__assembly.version
+
+    def close(self):
+        # an assembly given by the caller stays open, it may still be used after the pipeline
+        self.__outputs.clear()
+        if self.__owns_assembly:
+            self.__assembly.close()
+
+    def __enter__(self) -> 'Pipeline':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def assembly(self) -> Assembly:
+        return self.__assembly
+
+    @property
+    def completed(self) -> List[str]:
+        # stages whose output is cached
+        self.__check_assembly()
+        return [stage for stage in STAGES if stage in self.__outputs]
+
+    def __check_assembly(self):
+        # the assembly may be solved outside of the pipeline, so its dirty set cannot tell if the outputs are stale
+        if self.__assembly.version != self.__version:
+            self.__outputs.clear()
+            self.__version = self.__assembly.version
+
+    def invalidate(self, stage: str = 'solve'):
+        # drops the output of this stage and of every stage after it, the next run resumes from it
+        assert stage in STAGES, f'Stage must be one of {", ".join(STAGES)}'
+        for later_stage in STAGES[STAGES.index(stage):]:
+            self.__outputs.pop(later_stage, None)
+
+    def get(self, stage: str):
+        # the output of the stage, running it and the stages before it when they are not cached
+        assert stage in STAGES[:-1], f'Stage must be one of {", ".join(STAGES[:-1])}'
+        self.__check_assembly()
+        if stage not in self.__outputs:
+            # the stages before are run first, so the report of this stage only covers its own work
+            if stage != STAGES[0]:
+                self.get(STAGES[STAGES.index(stage) - 1])
+            run = getattr(self, f'_Pipeline__{stage}')
+            with instrumentation.stage(stage):
+                self.__outputs[stage] = run()
+        return self.__outputs[stage]
+
+    def run(self, until: str = 'fingers', rerun: Optional[str] = None):
+        # runs the stages up to `until`, reusing the cached ones; from `rerun` on they are run again
+        if rerun is not None:
+            self.invalidate(rerun)
+        return self.get(until)
+
+    @property
+    def bounds(self) -> Dict[Component, List[Tuple[float, float]]]:
+        return self.get('solve')
+
+    @property
+    def contact_graph(self) -> List[Set[int]]:
+        return self.get('collide')
+
+    @property
+    def joints(self) -> Dict[Component, List[Joint]]:
+        return self.get('joints')
+
+    @property
+    def cutouts(self) -> Dict[Component, PanelCutouts]:
+        return self.get('fingers')
+
+    def __solve(self) -> Dict[Component, List[Tuple[float, float]]]:
+        self.__assembly.solve()
+        return {item: self.__assembly.get_bounds(item) for item in self.__assembly.components}
+
+    def __collide(self) -> List[Set[int]]:
+        items = list(self.bounds)
+        items_bounds = list(self.bounds.values())
+
+        for i, j in find_collisions(items_bounds, [item.face for item in items]):
+            raise Exception(f'Collision between {items[i].label} and {items[j].label}')
+
+        contact_graph = build_contact_graph(items_bounds)
+
+        for i, j, k in find_invalid_corners([item.face for item in items], items_bounds, contact_graph):
+            raise Exception(f'Invalid corner between {items[i].label}, {items[j].label} and {items[k].label}')
+
+        return contact_graph
+
+    def __joints(self) -> Dict[Component, List[Joint]]:
+        return detect_joints(list(self.bounds), self.contact_graph)
+
+    def __fingers(self) -> Dict[Component, PanelCutouts]:
+        return {item: get_panel_cutouts(item_joints) for item, item_joints in self.joints.items()}
+
+    def render(self, target: Optional[TextIO] = None, output_format: str = 'svg', max_workers: Optional[int] = None,
+               buffer_size: int = 1 << 16):
+        # max_workers renders the SVG on a process pool, the fingers are then generated by the workers
+        assert output_format in OUTPUT_FORMATS, f'Output format must be one of {", ".join(OUTPUT_FORMATS)}'
+        if output_format == 'svg' and max_workers is not None:
+            joints = self.joints
+            with instrumentation.stage('render'):
+                write_lines(iter_svg_fragments_parallel(((item.bounds_on_face(), item_joints)
+                                                         for item, item_joints in joints.items()), max_workers),
+                            target, buffer_size)
+            return
+
+        cutouts = self.cutouts
+        with instrumentation.stage('render'):
+            if output_format == 'svg':
+                lines = iter_svg_cutout_lines((item.bounds_on_face(), item_cutouts)
+                                              for item, item_cutouts in cutouts.items())
+            elif output_format == 'dxf':
+                lines = iter_dxf_cutout_lines(((item.thickness, item.bounds_on_face(), item_cutouts)
+                                               for item, item_cutouts in cutouts.items()),
+                                              {item.thickness for item in cutouts})
+            else:
+                lines = iter_scad_cutout_lines(cutouts.items())
+            write_lines(lines, target, buffer_size)
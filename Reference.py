@@ -1,11 +1,56 @@
 from typing import Union
+from weakref import WeakValueDictionary
 
 
 class Reference:
-    def __init__(self, /, owner, prop: str):
-        self.owner = owner
-        self.prop = prop
-        self.ops = []
+    __slots__ = ('owner', 'prop', 'ops', '__weakref__')
+
+    # references are immutable and hash-consed: structurally identical expressions are the same object,
+    # so they can be shared between components and used as cache keys
+    # bare references are shared by their owner (a Component keeps one per property), expressions are
+    # interned here by the ids of their owners: the table never keeps an owner alive, and an id cannot be
+    # reused while the reference holding its owner is in the table
+    __interned = WeakValueDictionary()
+
+    def __new__(cls, /, owner, prop: str, ops: tuple = ()):
+        ops = tuple(ops)
+        if not ops:
+            return cls.__create(owner, prop, ops)
+        key = cls.__get_key(owner, prop, ops)
+        reference = cls.__interned.get(key)
+        if reference is None:
+            reference = cls.__interned[key] = cls.__create(owner, prop, ops)
+        return reference
+
+    @classmethod
+    def __create(cls, owner, prop: str, ops: tuple) -> 'Reference':
+        reference = super(Reference, cls).__new__(cls)
+        object.__setattr__(reference, 'owner', owner)
+        object.__setattr__(reference, 'prop', prop)
+        object.__setattr__(reference, 'ops', ops)
+        return reference
+
+    @classmethod
+    def __get_key(cls, owner, prop: str, ops: tuple) -> tuple:
+        # the type keeps 1, 1.0 and True apart
+        return (id(owner), prop, *((op, Reference, cls.__get_key(other.owner, other.prop, other.ops))
+                                   if isinstance(other, Reference) else (op, type(other), other)
+                                   for op, other in ops))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Reference is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('Reference is immutable')
+
+    def __reduce__(self):
+        return Reference, (self.owner, self.prop, self.ops)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     @property
     def value(self):
@@ -29,40 +74,31 @@ class Reference:
         return getattr(self.owner, f'{self.prop}_value')
 
     def __add__(self, other: Union[int, float, 'Reference']) -> 'Reference':
-        self.ops.append(('+', other))
-        return self
+        return Reference(self.owner, self.prop, (*self.ops, ('+', other)))
 
     def __radd__(self, other: Union[int, float, 'Reference']) -> 'Reference':
-        self.ops.append(('+', other))
-        return self
+        return Reference(self.owner, self.prop, (*self.ops, ('+', other)))
 
     def __sub__(self, other: Union[int, float, 'Reference']) -> 'Reference':
-        self.ops.append(('+', -other))
-        return self
+        return Reference(self.owner, self.prop, (*self.ops, ('+', -other)))
 
     def __rsub__(self, other: Union[int, float, 'Reference']) -> 'Reference':
-        self.ops.append(('-', other))
-        return self
+        return Reference(self.owner, self.prop, (*self.ops, ('-', other)))
 
     def __neg__(self) -> 'Reference':
-        self.ops.append(('*', -1))
-        return self
+        return Reference(self.owner, self.prop, (*self.ops, ('*', -1)))
 
     def __mul__(self, other: Union[int, float, 'Reference']) -> 'Reference':
-        self.ops.append(('*', other))
-        return self
+        return Reference(self.owner, self.prop, (*self.ops, ('*', other)))
 
     def __rmul__(self, other: Union[int, float, 'Reference']) -> 'Reference':
-        self.ops.append(('*', other))
-        return self
+        return Reference(self.owner, self.prop, (*self.ops, ('*', other)))
 
     def __truediv__(self, other: Union[int, float, 'Reference']) -> 'Reference':
-        self.ops.append(('*', 1 / other))
-        return self
+        return Reference(self.owner, self.prop, (*self.ops, ('*', 1 / other)))
 
     def __rtruediv__(self, other: Union[int, float, 'Reference']) -> 'Reference':
-        self.ops.append(('_', other))
-        return self
+        return Reference(self.owner, self.prop, (*self.ops, ('_', other)))
 
     def get_owners(self):
         owners = set()
@@ -72,5 +108,13 @@ class Reference:
         owners.add(self.owner)
         return owners
 
+    def get_properties(self):
+        properties = set()
+        for op, other in self.ops:
+            if isinstance(other, Reference):
+                properties.update(other.get_properties())
+        properties.add((self.owner, self.prop))
+        return properties
+
     def __repr__(self):
         return f'Ref<{self.owner.label}.{self.prop}>'
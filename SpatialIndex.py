@@ -0,0 +1,138 @@
+from math import floor
+from statistics import median
+from typing import Dict, Hashable, Iterable, Optional, Sequence, Set, Tuple
+
+from Component import Component
+
+Bounds = Sequence[Tuple[float, float]]
+
+
+class SpatialIndex(object):
+    # uniform grid: every box is registered in each cell it covers, queries only visit the cells they cover
+    def __init__(self, cell_size: float):
+        super(SpatialIndex, self).__init__()
+        assert cell_size > 0, 'Cell size must be positive'
+        self.__cell_size = cell_size
+        self.__cells: Dict[Tuple[int, int, int], Set[Hashable]] = {}
+        self.__bounds: Dict[Hashable, Bounds] = {}
+        # components this index listens to, and the ones whose bounds changed since they were indexed
+        self.__tracked: Set[Component] = set()
+        self.__stale: Set[Component] = set()
+
+    @classmethod
+    def from_components(cls, components: Iterable[Component], cell_size: Optional[float] = None) -> 'SpatialIndex':
+        components = list(components)
+        bounds = [component.full_bounds for component in components]
+        index = cls(cell_size if cell_size is not None else cls.suggest_cell_size(bounds))
+        for component, component_bounds in zip(components, bounds):
+            index.track(component, component_bounds)
+        return index
+
+    @staticmethod
+    def suggest_cell_size(bounds: Iterable[Bounds]) -> float:
+        # panels are thin on one axis, so their middle extent is what decides how many cells they cover
+        extents = [sorted(upper - lower for lower, upper in box)[1] for box in bounds]
+        extents = [extent for extent in extents if extent > 0]
+        return median(extents) if extents else 1
+
+    @property
+    def cell_size(self):
+        return self.__cell_size
+
+    def __len__(self):
+        return len(self.__bounds)
+
+    def __contains__(self, key):
+        return key in self.__bounds
+
+    def __cells_of(self, bounds: Bounds):
+        (x1, x2), (y1, y2), (z1, z2) = [(floor(lower / self.__cell_size), floor(upper / self.__cell_size))
+                                        for lower, upper in bounds]
+        for x in range(x1, x2 + 1):
+            for y in range(y1, y2 + 1):
+                for z in range(z1, z2 + 1):
+                    yield x, y, z
+
+    def insert(self, key: Hashable, bounds: Bounds):
+        assert key not in self.__bounds, f'{key} is already indexed'
+        bounds = tuple(tuple(axis_bounds) for axis_bounds in bounds)
+        self.__bounds[key] = bounds
+        for cell in self.__cells_of(bounds):
+            self.__cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key: Hashable):
+        # a tracked component is untracked too, otherwise its next edit would put it back in the index
+        if key in self.__tracked:
+            self.untrack(key)
+        else:
+            self.__remove(key)
+
+    def __remove(self, key: Hashable):
+        bounds = self.__bounds.pop(key)
+        for cell in self.__cells_of(bounds):
+            keys = self.__cells[cell]
+            keys.discard(key)
+            if not keys:
+                del self.__cells[cell]
+
+    def update(self, key: Hashable, bounds: Bounds):
+        if key in self.__bounds:
+            self.__remove(key)
+        self.insert(key, bounds)
+
+    def track(self, component: Component, bounds: Optional[Bounds] = None):
+        # the component is re-indexed on the next query whenever it is moved, resized or one of its references changes
+        self.insert(component, bounds if bounds is not None else component.full_bounds)
+        component.add_listener(self.__on_change)
+        self.__tracked.add(component)
+
+    def untrack(self, component: Component):
+        component.remove_listener(self.__on_change)
+        self.__tracked.discard(component)
+        self.__stale.discard(component)
+        self.__remove(component)
+
+    def close(self):
+        # untracks every component, so none of them keeps the listener of this index (and the index) alive
+        for component in list(self.__tracked):
+            self.untrack(component)
+
+    def __enter__(self) -> 'SpatialIndex':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __on_change(self, component: Component, dependencies_changed: bool):
+        self.__stale.add(component)
+
+    def __refresh(self):
+        while self.__stale:
+            component = self.__stale.pop()
+            self.update(component, component.full_bounds)
+
+    def get_bounds(self, key: Hashable) -> Bounds:
+        self.__refresh()
+        return self.__bounds[key]
+
+    def query_box(self, bounds: Bounds, touching: bool = True) -> Set[Hashable]:
+        # keys whose boxes intersect the given box, also the ones only touching it unless touching=False
+        self.__refresh()
+        candidates = set()
+        for cell in self.__cells_of(bounds):
+            candidates.update(self.__cells.get(cell, ()))
+        if touching:
+            return {key for key in candidates
+                    if all(lower <= other_upper and other_lower <= upper
+                           for (lower, upper), (other_lower, other_upper) in zip(bounds, self.__bounds[key]))}
+        return {key for key in candidates
+                if all(lower < other_upper and other_lower < upper
+                       for (lower, upper), (other_lower, other_upper) in zip(bounds, self.__bounds[key]))}
+
+    def query_point(self, point: Sequence[float]) -> Set[Hashable]:
+        return self.query_box([(value, value) for value in point], touching=True)
+
+    def neighbors(self, key: Hashable, touching: bool = True) -> Set[Hashable]:
+        keys = self.query_box(self.get_bounds(key), touching=touching)
+        keys.discard(key)
+        return keys
@@ -0,0 +1,48 @@
+from random import Random
+from typing import List
+
+from Component import Component
+
+THICKNESSES = [4.3, 12, 18]
+WIDTHS = [300, 400, 450, 500, 600, 800, 900]
+HEIGHTS = [720, 900, 2000]
+DEPTHS = [300, 350, 560, 580]
+
+
+def generate_cabinet_row(panel_count: int, seed: int = 0) -> List[Component]:
+    # a row of cabinets wired like c1-c5 in main.py: sides, bottom and top reference the back panel,
+    # each back panel starts where the previous cabinet ends, so references chain along the whole row;
+    # shelves sit between the sides and drawer fronts cover the opening
+    random = Random(seed)
+    components = []
+    previous = None
+    while len(components) < panel_count:
+        number = len(components)
+        thickness = random.choice(THICKNESSES)
+        width, height, depth = random.choice(WIDTHS), random.choice(HEIGHTS), random.choice(DEPTHS)
+        back = Component(f'back{number}', thickness, 'front', left=previous.right if previous is not None else 0,
+                         width=width, bottom=0, height=height, back=depth)
+        left = Component(f'left{number}', thickness, 'side', left=back.left, front=0, back=back.back,
+                         bottom=back.bottom, top=back.top)
+        right = Component(f'right{number}', thickness, 'side', right=back.right, front=left.front, back=back.back,
+                          bottom=back.bottom, top=back.top)
+        bottom = Component(f'bottom{number}', thickness, 'top', left=left.left, right=right.right,
+                           bottom=back.bottom, front=left.front, back=back.back)
+        top = Component(f'top{number}', thickness, 'top', left=left.left, right=right.right, top=back.top,
+                        front=left.front, back=back.back)
+        cabinet = [back, left, right, bottom, top]
+
+        shelves = random.randint(0, 3)
+        for shelf in range(shelves):
+            cabinet.append(Component(f'shelf{number}_{shelf}', thickness, 'top', left=left.right, right=right.left,
+                                     front=left.front + 20, back=back.front,
+                                     bottom=bottom.top + (height - 2 * thickness) * (shelf + 1) / (shelves + 1)))
+        drawers = random.randint(0, 3)
+        for drawer in range(drawers):
+            cabinet.append(Component(f'drawer{number}_{drawer}', thickness, 'front', left=left.left + 2,
+                                     right=right.right - 2, back=left.front, bottom=back.bottom + 150 * drawer + 2,
+                                     height=146))
+
+        components.extend(cabinet[:panel_count - len(components)])
+        previous = back
+    return components
@@ -0,0 +1,86 @@
+import argparse
+import json
+import os
+import platform
+import sys
+from time import perf_counter
+from typing import Dict, Sequence
+
+from benchmarks.generator import generate_cabinet_row
+from ComponentStore import ComponentStore
+from finger_maker import finger_joints_cache
+from Pipeline import STAGES, Pipeline
+
+DEFAULT_SIZES = [10, 100, 1_000, 10_000, 100_000]
+
+
+def run_benchmark(panel_count: int, seed: int = 0) -> Dict:
+    stages = {}
+
+    start = perf_counter()
+    components = generate_cabinet_row(panel_count, seed)
+    stages['build'] = perf_counter() - start
+
+    with Pipeline(components) as pipeline:
+        for stage in STAGES[:-1]:
+            if stage == 'fingers':
+                # the cache is cleared so the first run of every size measures the generation, not the lookups
+                finger_joints_cache.clear()
+            start = perf_counter()
+            pipeline.get(stage)
+            stages[stage] = perf_counter() - start
+
+        start = perf_counter()
+        with open(os.devnull, 'w') as target:
+            pipeline.render(target)
+        stages['svg'] = perf_counter() - start
+        joints = sum(len(item_joints) for item_joints in pipeline.joints.values())
+        cutouts = sum(len(rects) for item_cutouts in pipeline.cutouts.values() for rects in item_cutouts)
+
+    return {
+        'panels': panel_count,
+        'seed': seed,
+        'joints': joints,
+        'cutouts': cutouts,
+        'stages': stages,
+        'total': sum(stages.values()),
+        # the same row solved by the vectorized store, to compare with the solve stage
+        'store': run_store_benchmark(components),
+    }
+
+
+def run_store_benchmark(components: Sequence) -> Dict:
+    start = perf_counter()
+    store = ComponentStore.from_components(components)
+    build = perf_counter() - start
+    start = perf_counter()
+    store.solve()
+    return {'build': build, 'solve': perf_counter() - start}
+
+
+def run_benchmarks(sizes: Sequence[int] = DEFAULT_SIZES, seed: int = 0) -> Dict:
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': [run_benchmark(size, seed) for size in sizes],
+    }
+
+
+def main(arguments: Sequence[str] = None):
+    parser = argparse.ArgumentParser(description='Time each stage on generated rows of cabinets')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='panel counts to run')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='JSON file to write, stdout by default')
+    arguments = parser.parse_args(arguments)
+
+    report = run_benchmarks(arguments.sizes, arguments.seed)
+    if arguments.output:
+        with open(arguments.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == "__main__":
+    main()
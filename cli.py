@@ -0,0 +1,83 @@
+import argparse
+import os
+import sys
+from typing import List, Optional, Sequence
+
+# only the loader is imported up front, the geometry and output modules (and numpy) are imported
+# the first time an assembly is rendered, so validating files starts quickly
+
+OUTPUT_EXTENSIONS = {'svg': '.svg', 'dxf': '.dxf', 'scad': '.scad'}
+
+
+def validate(path: str):
+    # loads the file, builds its components, checks that every axis is defined and solves them: labels,
+    # expressions, references and constraints are checked without running the collision and joint stages
+    from Assembly import Assembly
+    from loader import check_components, load_components
+    components = load_components(path)
+    check_components(components)
+    with Assembly(components) as assembly:
+        assembly.solve()
+
+
+def render(path: str, output_format: str, output: Optional[str], max_workers: Optional[int]):
+    from loader import check_components, load_components
+    from Pipeline import Pipeline
+    components = load_components(path)
+    check_components(components)
+    with Pipeline(components) as pipeline:
+        if output is None:
+            pipeline.render(sys.stdout, output_format, max_workers)
+            return
+        with open(output, 'w') as target:
+            pipeline.render(target, output_format, max_workers)
+
+
+def get_output_path(path: str, output_format: str, output: Optional[str], output_dir: Optional[str]) -> Optional[str]:
+    if output is not None:
+        return output
+    if output_dir is None:
+        return None
+    return os.path.join(output_dir, os.path.splitext(os.path.basename(path))[0] + OUTPUT_EXTENSIONS[output_format])
+
+
+def main(arguments: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Validate or render assemblies described in JSON or YAML files')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    validate_parser = commands.add_parser('validate', help='check that the files describe valid assemblies')
+    validate_parser.add_argument('files', nargs='+')
+
+    render_parser = commands.add_parser('render', help='run the pipeline and write the cut files')
+    render_parser.add_argument('files', nargs='+')
+    render_parser.add_argument('-f', '--format', choices=list(OUTPUT_EXTENSIONS), default='svg')
+    outputs = render_parser.add_mutually_exclusive_group()
+    outputs.add_argument('-o', '--output', help='output file, only with a single input file (stdout by default)')
+    outputs.add_argument('-d', '--output-dir', help='directory receiving one output file per input file')
+    render_parser.add_argument('-j', '--workers', type=int, help='render SVG on a pool of this many processes')
+
+    arguments = parser.parse_args(arguments)
+    if arguments.command == 'render' and arguments.output is not None and len(arguments.files) > 1:
+        parser.error('--output takes a single input file, use --output-dir for several')
+    if arguments.command == 'render' and arguments.output_dir is not None:
+        os.makedirs(arguments.output_dir, exist_ok=True)
+
+    # every file is processed in this one process, a failing file is reported and the next one goes on
+    failures: List[str] = []
+    for path in arguments.files:
+        try:
+            if arguments.command == 'validate':
+                validate(path)
+                print(f'{path}: OK')
+            else:
+                render(path, arguments.format,
+                       get_output_path(path, arguments.format, arguments.output, arguments.output_dir),
+                       arguments.workers)
+        except Exception as error:
+            failures.append(path)
+            print(f'{path}: {error}', file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def find_collisions(bounds, groups: Optional[Sequence] = None, chunk_size: int = 1024) -> np.ndarray:
+    # bounds: (N, 3, 2) array of (min, max) per axis
+    # returns the (i, j) pairs, i < j, whose boxes overlap with a positive volume - touching is not a collision
+    # only pairs within the same group (e.g. the same face) are checked when groups are given
+    bounds = np.asarray(bounds, dtype=float)
+    assert bounds.ndim == 3 and bounds.shape[1:] == (3, 2), 'Expected bounds of shape (N, 3, 2)'
+    count = len(bounds)
+    if groups is not None:
+        groups = np.unique(np.asarray(groups), return_inverse=True)[1].reshape(-1)
+        assert len(groups) == count, 'Expected one group per bounds'
+
+    # sorted by the lower x bound, the boxes a row can overlap on x form a window right after it
+    order = np.argsort(bounds[:, 0, 0], kind='stable')
+    lower = bounds[order, :, 0]
+    upper = bounds[order, :, 1]
+    if groups is not None:
+        groups = groups[order]
+
+    pairs = []
+    for row_start in range(0, count, chunk_size):
+        row_end = min(row_start + chunk_size, count)
+        window_end = int(np.searchsorted(lower[:, 0], upper[row_start:row_end, 0].max(), side='left'))
+        # the window is processed in column blocks, so memory stays at chunk_size x chunk_size
+        for column_start in range(row_start, window_end, chunk_size):
+            column_end = min(column_start + chunk_size, window_end)
+            overlap = lower[None, column_start:column_end, 0] < upper[row_start:row_end, None, 0]
+            if groups is not None:
+                overlap &= groups[row_start:row_end, None] == groups[None, column_start:column_end]
+            rows, columns = np.nonzero(overlap)
+            rows += row_start
+            columns += column_start
+            candidates = rows < columns
+            rows, columns = rows[candidates], columns[candidates]
+            # remaining axes are only checked on the x candidates
+            hits = np.all((lower[rows] < upper[columns]) & (lower[columns] < upper[rows]), axis=-1)
+            if np.any(hits):
+                pairs.append(np.stack([order[rows[hits]], order[columns[hits]]], axis=-1))
+
+    if not pairs:
+        return np.zeros((0, 2), dtype=np.int64)
+    pairs = np.sort(np.concatenate(pairs), axis=-1)
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+
+def sweep_and_prune(bounds: Sequence, axis: int = 0) -> Iterator[Tuple[int, int]]:
+    # broad phase: yields the (i, j) pairs, i < j, whose boxes overlap or touch on every axis
+    # interval endpoints are swept along one axis, only boxes open at the same time are compared on the others
+    events: List[Tuple[float, int, int]] = []
+    for index, box in enumerate(bounds):
+        start, end = box[axis]
+        # at equal coordinates starts come first, so touching boxes are still reported
+        events.append((start, 0, index))
+        events.append((end, 1, index))
+    events.sort()
+
+    other_axes = [i for i in range(3) if i != axis]
+    active = set()
+    for _, is_end, index in events:
+        if is_end:
+            active.discard(index)
+            continue
+        box = bounds[index]
+        for other in active:
+            other_box = bounds[other]
+            if all(box[i][0] <= other_box[i][1] and other_box[i][0] <= box[i][1] for i in other_axes):
+                yield (other, index) if other < index else (index, other)
+        active.add(index)
@@ -0,0 +1,59 @@
+from typing import Iterator, List, Optional, Sequence, Set, Tuple
+
+from collision import sweep_and_prune
+
+Bounds = Sequence[Tuple[float, float]]
+
+THICKNESS_AXES = {'side': 0, 'front': 1, 'top': 2}
+
+
+def build_contact_graph(bounds: Sequence[Bounds]) -> List[Set[int]]:
+    # adjacency sets of the boxes that touch or intersect each other
+    graph = [set() for _ in bounds]
+    for i, j in sweep_and_prune(bounds):
+        graph[i].add(j)
+        graph[j].add(i)
+    return graph
+
+
+def iter_triangles(graph: Sequence[Set[int]]) -> Iterator[Tuple[int, int, int]]:
+    # every triangle once, as sorted (i, j, k): edges are oriented from lower to higher degree,
+    # so each node only intersects its few higher ranked neighbors
+    rank = {node: position for position, node in enumerate(sorted(range(len(graph)), key=lambda n: len(graph[n])))}
+    forward = [{other for other in neighbors if rank[other] > rank[node]} for node, neighbors in enumerate(graph)]
+    for node, node_forward in enumerate(forward):
+        for other in node_forward:
+            for third in node_forward & forward[other]:
+                yield tuple(sorted((node, other, third)))
+
+
+def get_common_region(*boxes: Bounds) -> Optional[List[Tuple[float, float]]]:
+    region = [(max(box[axis][0] for box in boxes), min(box[axis][1] for box in boxes)) for axis in range(3)]
+    if any(lower >= upper for lower, upper in region):
+        return None
+    return region
+
+
+def is_valid_corner(faces: Sequence[str], boxes: Sequence[Bounds]) -> bool:
+    # three panels of different faces sharing a volume form a corner, it can only be jointed if at least
+    # one of them ends there, panels crossing each other in the middle of all three cannot be cut
+    if len(set(faces)) != 3:
+        return True
+    region = get_common_region(*boxes)
+    if region is None:
+        return True
+    for face, box in zip(faces, boxes):
+        for axis in range(3):
+            if axis == THICKNESS_AXES[face]:
+                continue
+            if region[axis][0] <= box[axis][0] or region[axis][1] >= box[axis][1]:
+                return True
+    return False
+
+
+def find_invalid_corners(faces: Sequence[str], bounds: Sequence[Bounds],
+                         graph: Optional[Sequence[Set[int]]] = None) -> List[Tuple[int, int, int]]:
+    if graph is None:
+        graph = build_contact_graph(bounds)
+    return sorted(triangle for triangle in iter_triangles(graph)
+                  if not is_valid_corner([faces[i] for i in triangle], [bounds[i] for i in triangle]))
@@ -0,0 +1,150 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple, Union
+
+import numpy as np
+
+from svg_writer import FaceBounds, PanelCutouts, PanelJoint, get_panel_cutouts, write_lines
+
+Point = Tuple[float, float]
+
+
+def get_layer_name(thickness: Union[int, float]) -> str:
+    # R12 layer names only allow letters, digits, '$', '-' and '_'
+    # 18 and 18.0 are the same thickness, so they must give the same layer
+    thickness = float(thickness)
+    if thickness.is_integer():
+        thickness = int(thickness)
+    return f'THICKNESS_{thickness}'.replace('.', '_')
+
+
+def iter_polyline_lines(layer: str, points: Sequence[Point]) -> Iterator[str]:
+    # closed 2D polyline, R12 style: a POLYLINE header, one VERTEX per point and a SEQEND
+    yield f'0\nPOLYLINE\n8\n{layer}\n66\n1\n10\n0.0\n20\n0.0\n30\n0.0\n70\n1\n'
+    for x, y in points:
+        yield f'0\nVERTEX\n8\n{layer}\n10\n{x}\n20\n{y}\n30\n0.0\n'
+    yield f'0\nSEQEND\n8\n{layer}\n'
+
+
+def get_outline_loops(face_bounds: FaceBounds, cutouts: PanelCutouts) -> List[List[Point]]:
+    # the panel rect minus its cutouts as closed loops, material on the left: the finger spaces on the edges
+    # become notches of the outline, a cutout inside the panel would give a loop of its own
+    (x1, x2), (y1, y2) = face_bounds
+    rects = [(max(x, x1), max(y, y1), min(x + width, x2), min(y + height, y2))
+             for joint_rects in cutouts for x, y, width, height in joint_rects]
+    rects = [rect for rect in rects if rect[0] < rect[2] and rect[1] < rect[3]]
+    if not rects:
+        return [[(x1, y1), (x2, y1), (x2, y2), (x1, y2)]]
+
+    # cells of the grid of every rect coordinate, padded with an empty ring
+    xs = sorted({x1, x2, *(rect[0] for rect in rects), *(rect[2] for rect in rects)})
+    ys = sorted({y1, y2, *(rect[1] for rect in rects), *(rect[3] for rect in rects)})
+    x_index = {x: i for i, x in enumerate(xs)}
+    y_index = {y: i for i, y in enumerate(ys)}
+    filled = np.zeros((len(xs) + 1, len(ys) + 1), dtype=bool)
+    filled[1:-1, 1:-1] = True
+    for left, bottom, right, top in rects:
+        filled[x_index[left] + 1:x_index[right] + 1, y_index[bottom] + 1:y_index[top] + 1] = False
+
+    # straight runs of grid edges between a filled and an empty cell, grid point (i, j) is i * len(ys) + j
+    # a run never passes through a corner of the outline, so the runs are the sides of the loops
+    height = len(ys)
+    west, east = filled[:-1, 1:-1], filled[1:, 1:-1]
+    south, north = filled[1:-1, :-1], filled[1:-1, 1:]
+    starts, ends = [], []
+    for mask, forward, along_x in ((west & ~east, True, False), (east & ~west, False, False),
+                                   (north & ~south, True, True), (south & ~north, False, True)):
+        rows, lowers, uppers = get_runs(mask.T if along_x else mask)
+        lowers, uppers = (lowers * height + rows, uppers * height + rows) if along_x else \
+            (rows * height + lowers, rows * height + uppers)
+        starts.append(lowers if forward else uppers)
+        ends.append(uppers if forward else lowers)
+
+    # loops touching at a corner leave that grid point twice, the second side is kept apart
+    following: Dict[int, int] = {}
+    pinched: Dict[int, int] = {}
+    for start, end in zip(np.concatenate(starts).tolist(), np.concatenate(ends).tolist()):
+        if start in following:
+            pinched[start] = end
+        else:
+            following[start] = end
+
+    loops = []
+    x_values, y_values = np.array(xs, dtype=float), np.array(ys, dtype=float)
+    while following or pinched:
+        start, point = (following or pinched).popitem()
+        points = [start]
+        while point != start:
+            points.append(point)
+            point = following.pop(point) if point not in pinched else \
+                pop_next_point(points[-2], point, following, pinched, height)
+        points = np.array(points)
+        loops.append(list(zip(x_values[points // height].tolist(), y_values[points % height].tolist())))
+    return loops
+
+
+def pop_next_point(previous: int, point: int, following: Dict[int, int], pinched: Dict[int, int],
+                   height: int) -> int:
+    # where the loop goes from a corner shared by two loops: it turns left, so the loops stay apart
+    if point not in following:
+        return pinched.pop(point)
+    (previous_x, previous_y), (x, y) = divmod(previous, height), divmod(point, height)
+    next_x, next_y = divmod(following[point], height)
+    if (x - previous_x) * (next_y - y) - (y - previous_y) * (next_x - x) > 0:
+        return following.pop(point)
+    return pinched.pop(point)
+
+
+def get_runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # row, first and last + 1 column of every run of True in the rows of the mask
+    padded = np.zeros((mask.shape[0], mask.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    steps = np.diff(padded, axis=1)
+    rows, lowers = np.nonzero(steps == 1)
+    _, uppers = np.nonzero(steps == -1)
+    return rows, lowers, uppers
+
+
+def iter_panel_cutout_lines(thickness: Union[int, float], face_bounds: FaceBounds,
+                            cutouts: PanelCutouts) -> Iterator[str]:
+    # one closed polyline per outline loop on the layer of the panel, the notches are part of the outline
+    # so no edge is cut twice
+    layer = get_layer_name(thickness)
+    for points in get_outline_loops(face_bounds, cutouts):
+        yield from iter_polyline_lines(layer, points)
+
+
+def iter_panel_lines(thickness: Union[int, float], face_bounds: FaceBounds,
+                     joints: Iterable[PanelJoint]) -> Iterator[str]:
+    return iter_panel_cutout_lines(thickness, face_bounds, get_panel_cutouts(joints))
+
+
+def iter_layer_table_lines(thicknesses: Iterable[Union[int, float]]) -> Iterator[str]:
+    layers = sorted({get_layer_name(thickness) for thickness in thicknesses})
+    yield f'0\nSECTION\n2\nTABLES\n0\nTABLE\n2\nLAYER\n70\n{len(layers)}\n'
+    for layer in layers:
+        yield f'0\nLAYER\n2\n{layer}\n70\n0\n62\n7\n6\nCONTINUOUS\n'
+    yield '0\nENDTAB\n0\nENDSEC\n'
+
+
+def iter_dxf_cutout_lines(panels: Iterable[Tuple[Union[int, float], FaceBounds, PanelCutouts]],
+                          thicknesses: Optional[Iterable[Union[int, float]]] = None) -> Iterator[str]:
+    # panels are (thickness, face bounds, cutouts), written one at a time
+    # the layer table needs every thickness before the first entity, without it readers create the layers on use
+    yield '0\nSECTION\n2\nHEADER\n9\n$ACADVER\n1\nAC1009\n0\nENDSEC\n'
+    if thicknesses is not None:
+        yield from iter_layer_table_lines(thicknesses)
+    yield '0\nSECTION\n2\nENTITIES\n'
+    for thickness, face_bounds, cutouts in panels:
+        yield from iter_panel_cutout_lines(thickness, face_bounds, cutouts)
+    yield '0\nENDSEC\n0\nEOF\n'
+
+
+def iter_dxf_lines(panels: Iterable[Tuple[Union[int, float], FaceBounds, Iterable[PanelJoint]]],
+                   thicknesses: Optional[Iterable[Union[int, float]]] = None) -> Iterator[str]:
+    return iter_dxf_cutout_lines(((thickness, face_bounds, get_panel_cutouts(joints))
+                                  for thickness, face_bounds, joints in panels), thicknesses)
+
+
+def write_dxf(panels: Iterable[Tuple[Union[int, float], FaceBounds, Iterable[PanelJoint]]],
+              target: Optional[TextIO] = None, buffer_size: int = 1 << 16,
+              thicknesses: Optional[Iterable[Union[int, float]]] = None):
+    write_lines(iter_dxf_lines(panels, thicknesses), target, buffer_size)
@@ -1,5 +1,7 @@
+from collections import OrderedDict
+from collections.abc import Sequence
 from math import ceil, floor
-from typing import List
+from typing import List, Optional, Tuple, Union
 
 
 class StartEndOptions:
@@ -26,7 +28,208 @@ class RoundingOptions:
         print({v for k, v in cls.__dict__.items() if not k.startswith('_')})
 
 
+class FingerPart:
+    # one part of a FingerJoints result, readable both as attributes and like the former dicts (part['start'])
+    __slots__ = ('_joints', '_index')
+
+    _fields = ('type', 'length', 'start', 'end', 'portion', 'start_time', 'end_time')
+
+    def __init__(self, joints: 'FingerJoints', index: int):
+        self._joints = joints
+        self._index = index
+
+    @property
+    def type(self):
+        return self._joints.get_type(self._index)
+
+    @property
+    def length(self):
+        return self._joints.get_length(self._index)
+
+    @property
+    def start(self):
+        return self._joints.get_start(self._index)
+
+    @property
+    def end(self):
+        return self._joints.get_end(self._index)
+
+    @property
+    def portion(self):
+        return self._joints.get_portion(self._index)
+
+    @property
+    def start_time(self):
+        return self._joints.get_start_time(self._index)
+
+    @property
+    def end_time(self):
+        return self._joints.get_end_time(self._index)
+
+    def keys(self):
+        return self._fields
+
+    def __getitem__(self, key: str):
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self._fields}
+
+    def __eq__(self, other):
+        if isinstance(other, (FingerPart, dict)):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+
+class FingerJoints(Sequence):
+    # parts as parallel tuples of the raw type/length/start, every other field is derived when read
+    # flipped() and swapped() share the tuples and only toggle how they are read
+    __slots__ = ('_is_finger', '_lengths', '_starts', '_total_length', '_flipped', '_swapped')
+
+    def __init__(self, is_finger: Tuple[bool, ...], lengths: Tuple[float, ...], starts: Tuple[float, ...],
+                 total_length: float, flipped: bool = False, swapped: bool = False):
+        self._is_finger = is_finger
+        self._lengths = lengths
+        self._starts = starts
+        self._total_length = total_length
+        self._flipped = flipped
+        self._swapped = swapped
+
+    @property
+    def total_length(self):
+        return self._total_length
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def __getitem__(self, index: int) -> FingerPart:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('finger part index out of range')
+        return FingerPart(self, index)
+
+    def flipped(self) -> 'FingerJoints':
+        return FingerJoints(self._is_finger, self._lengths, self._starts, self._total_length,
+                            not self._flipped, self._swapped)
+
+    def swapped(self) -> 'FingerJoints':
+        return FingerJoints(self._is_finger, self._lengths, self._starts, self._total_length,
+                            self._flipped, not self._swapped)
+
+    def __raw(self, index: int):
+        if self._flipped:
+            index = len(self._lengths) - 1 - index
+        return index
+
+    def __end(self, raw_index: int):
+        return round(self._starts[raw_index] + self._lengths[raw_index], 12)
+
+    def get_type(self, index: int):
+        return "FINGER" if self._is_finger[self.__raw(index)] != self._swapped else "SPACE"
+
+    def get_length(self, index: int):
+        return round(self._lengths[self.__raw(index)], 12)
+
+    def get_start(self, index: int):
+        if self._flipped:
+            return self.__end(-1) - self.__end(self.__raw(index))
+        return round(self._starts[index], 12)
+
+    def get_end(self, index: int):
+        if self._flipped:
+            return self.__end(-1) - round(self._starts[self.__raw(index)], 12)
+        return self.__end(index)
+
+    def get_portion(self, index: int):
+        return round(self._lengths[self.__raw(index)] / self._total_length, 12)
+
+    def get_start_time(self, index: int):
+        raw_index = self.__raw(index)
+        if self._flipped:
+            return 1 - round((self._starts[raw_index] + self._lengths[raw_index]) / self._total_length, 12)
+        return round(self._starts[raw_index] / self._total_length, 12)
+
+    def get_end_time(self, index: int):
+        raw_index = self.__raw(index)
+        if self._flipped:
+            return 1 - round(self._starts[raw_index] / self._total_length, 12)
+        return round((self._starts[raw_index] + self._lengths[raw_index]) / self._total_length, 12)
+
+    def to_dicts(self) -> List[dict]:
+        return [part.to_dict() for part in self]
+
+
+class FingerJointsCache:
+    # least recently used results of generate_finger_joints, keyed by its arguments
+    def __init__(self, capacity: int = 1024):
+        assert capacity >= 0, 'Capacity must not be negative'
+        self._capacity = capacity
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @capacity.setter
+    def capacity(self, capacity: int):
+        assert capacity >= 0, 'Capacity must not be negative'
+        self._capacity = capacity
+        while len(self._entries) > capacity:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: tuple) -> Optional[FingerJoints]:
+        parts = self._entries.get(key)
+        if parts is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return parts
+
+    def put(self, key: tuple, parts: FingerJoints):
+        if self._capacity == 0:
+            return
+        self._entries[key] = parts
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._capacity:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries), 'capacity': self._capacity}
+
+
+finger_joints_cache = FingerJointsCache()
+
+
 def generate_finger_joints(total_length, finger_length, space_length, start_with, end_with, rounding):
+    key = (total_length, finger_length, space_length, start_with, end_with, rounding)
+    parts = finger_joints_cache.get(key)
+    if parts is None:
+        parts = _generate_finger_joints(*key)
+        finger_joints_cache.put(key, parts)
+    # results are immutable, flip_finger_joints and swap_finger_joints return views, so sharing is safe
+    return parts
+
+
+def _generate_finger_joints(total_length, finger_length, space_length, start_with, end_with, rounding):
     start_type = "finger" if start_with in ["finger", "half_finger"] else "space"
     end_type = "finger" if end_with in ["finger", "half_finger"] else "space"
     rounding_type = "grow" if rounding in ["grow_finger", "grow_space", "grow_both"] else "shrink"
@@ -169,18 +372,118 @@ def generate_finger_joints(total_length, finger_length, space_length, start_with
         parts.append(("SPACE", space_length / 2, position, position + space_length / 2))
         position += space_length / 2
 
-    return [{
-        'type': p[0],
-        'length': round(p[1], 12),
-        'start': round(p[2], 12),
-        'end': round(p[3], 12),
-        'portion': round(p[1] / total_length, 12),
-        'start_time': round(p[2] / total_length, 12),
-        'end_time': round(p[3] / total_length, 12),
-    } for p in parts]
+    return FingerJoints(tuple(p[0] == "FINGER" for p in parts), tuple(p[1] for p in parts),
+                        tuple(p[2] for p in parts), total_length)
+
+
+def generate_finger_joints_batch(total_length, finger_length, space_length, start_with, end_with, rounding):
+    # same as generate_finger_joints for many edges at once, every argument is a scalar or an array (broadcast)
+    # returns (joints, parts) structured arrays, parts of joint i are parts[joints['part_start'][i]:][:part_count]
+    import numpy as np
+
+    total_length, finger_length, space_length, start_with, end_with, rounding = np.broadcast_arrays(
+        np.asarray(total_length, dtype=float), np.asarray(finger_length, dtype=float),
+        np.asarray(space_length, dtype=float), np.asarray(start_with), np.asarray(end_with), np.asarray(rounding))
+    total_length, finger_length, space_length = total_length.ravel(), finger_length.ravel(), space_length.ravel()
+    start_with, end_with, rounding = start_with.ravel(), end_with.ravel(), rounding.ravel()
+
+    start_end_options = ["finger", "space", "half_finger", "half_space"]
+    rounding_options = ["grow_finger", "grow_space", "grow_both", "shrink_finger", "shrink_space", "shrink_both"]
+    for name, values, options in (('start_with', start_with, start_end_options),
+                                  ('end_with', end_with, start_end_options),
+                                  ('rounding', rounding, rounding_options)):
+        invalid = ~np.isin(values, options)
+        if np.any(invalid):
+            raise ValueError(f'Invalid {name}: {values[invalid][0]}')
+
+    start_is_finger = np.isin(start_with, ["finger", "half_finger"])
+    end_is_finger = np.isin(end_with, ["finger", "half_finger"])
+    start_factor = np.where(np.isin(start_with, ["half_finger", "half_space"]), 0.5, 1.0)
+    end_factor = np.where(np.isin(end_with, ["half_finger", "half_space"]), 0.5, 1.0)
+    same_type = start_is_finger == end_is_finger
+
+    # start, end and the part in between them when both are of the same type, added in that order
+    total_fingers_length = np.where(start_is_finger, finger_length * start_factor, 0) + \
+        np.where(end_is_finger, finger_length * end_factor, 0) + \
+        np.where(same_type & ~start_is_finger, finger_length, 0)
+    total_finger_count = np.where(start_is_finger, start_factor, 0) + np.where(end_is_finger, end_factor, 0) + \
+        np.where(same_type & ~start_is_finger, 1, 0)
+    total_spaces_length = np.where(~start_is_finger, space_length * start_factor, 0) + \
+        np.where(~end_is_finger, space_length * end_factor, 0) + \
+        np.where(same_type & start_is_finger, space_length, 0)
+    total_space_count = np.where(~start_is_finger, start_factor, 0) + np.where(~end_is_finger, end_factor, 0) + \
+        np.where(same_type & start_is_finger, 1, 0)
+
+    remaining_length = total_length - (total_fingers_length + total_spaces_length)
+    if np.any(remaining_length < 0):
+        raise ValueError(f'Not enough space for the given finger and space lengths')
+
+    real_count_of_couples = remaining_length / (finger_length + space_length)
+    num_of_couples = np.where(np.isin(rounding, ["grow_finger", "grow_space", "grow_both"]),
+                              np.floor(real_count_of_couples), np.ceil(real_count_of_couples)).astype(np.int64)
+
+    total_fingers_length = total_fingers_length + num_of_couples * finger_length
+    total_spaces_length = total_spaces_length + num_of_couples * space_length
+    total_finger_count = total_finger_count + num_of_couples
+    total_space_count = total_space_count + num_of_couples
+
+    total_consumed_length = total_fingers_length + total_spaces_length
+    total_length_diff = np.abs(total_length - total_consumed_length)
+    both_for_fingers = total_length_diff / total_consumed_length * total_fingers_length / total_finger_count
+    both_for_spaces = total_length_diff / total_consumed_length * total_spaces_length / total_space_count
+    sign = np.where(np.char.startswith(rounding, "grow"), 1, -1)
+    finger_length = finger_length + sign * np.select(
+        [np.char.endswith(rounding, "_finger"), np.char.endswith(rounding, "_both")],
+        [total_length_diff / total_finger_count, both_for_fingers], 0)
+    space_length = space_length + sign * np.select(
+        [np.char.endswith(rounding, "_space"), np.char.endswith(rounding, "_both")],
+        [total_length_diff / total_space_count, both_for_spaces], 0)
+
+    # parts alternate from the start type, only the first and the last one can be halves
+    part_count = 2 + same_type + 2 * num_of_couples
+    part_start = np.cumsum(part_count) - part_count
+    joint = np.repeat(np.arange(len(part_count)), part_count)
+    k = np.arange(part_count.sum()) - part_start[joint]
+
+    start_type_length = np.where(start_is_finger, finger_length, space_length)[joint]
+    other_type_length = np.where(start_is_finger, space_length, finger_length)[joint]
+    first_length = start_type_length * start_factor[joint]
+    is_start_type = k % 2 == 0
+    length = np.where(is_start_type, start_type_length, other_type_length)
+    length = np.where(k == 0, first_length, length)
+    is_last = k == part_count[joint] - 1
+    length = np.where(is_last, np.where(end_is_finger, finger_length, space_length)[joint] * end_factor[joint], length)
+    start = np.where(k == 0, 0,
+                     first_length + (k // 2) * other_type_length + np.maximum(k - 1, 0) // 2 * start_type_length)
+    end = start + length
+    is_finger = is_start_type == start_is_finger[joint]
+
+    joints = np.zeros(len(part_count), dtype=[('finger_length', float), ('space_length', float),
+                                              ('finger_count', float), ('space_count', float),
+                                              ('part_start', np.int64), ('part_count', np.int64)])
+    joints['finger_length'] = finger_length
+    joints['space_length'] = space_length
+    joints['finger_count'] = total_finger_count
+    joints['space_count'] = total_space_count
+    joints['part_start'] = part_start
+    joints['part_count'] = part_count
+
+    parts = np.zeros(len(k), dtype=[('joint', np.int64), ('type', 'U6'), ('length', float), ('start', float),
+                                    ('end', float), ('portion', float), ('start_time', float), ('end_time', float)])
+    parts['joint'] = joint
+    parts['type'] = np.where(is_finger, "FINGER", "SPACE")
+    parts['length'] = np.round(length, 12)
+    parts['start'] = np.round(start, 12)
+    parts['end'] = np.round(end, 12)
+    parts['portion'] = np.round(length / total_length[joint], 12)
+    parts['start_time'] = np.round(start / total_length[joint], 12)
+    parts['end_time'] = np.round(end / total_length[joint], 12)
+    return joints, parts
 
 
-def flip_finger_joints(finger_joints: List[dict]):
+def flip_finger_joints(finger_joints: Union[FingerJoints, List[dict]]):
+    if isinstance(finger_joints, FingerJoints):
+        return finger_joints.flipped()
     total_length = finger_joints[-1]['end']
     for joint in finger_joints:
         joint['start'], joint['end'] = total_length - joint['end'], total_length - joint['start']
@@ -188,7 +491,9 @@ def flip_finger_joints(finger_joints: List[dict]):
     return finger_joints[::-1]
 
 
-def swap_finger_joints(finger_joints: List[dict]):
+def swap_finger_joints(finger_joints: Union[FingerJoints, List[dict]]):
+    if isinstance(finger_joints, FingerJoints):
+        return finger_joints.swapped()
     for joint in finger_joints:
         joint['type'] = 'SPACE' if joint['type'] == 'FINGER' else 'FINGER'
     return finger_joints
@@ -0,0 +1,141 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from importlib import import_module
+from time import perf_counter
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# (module, class or None for a module level function, attribute) of the functions counted by default
+# functions imported by name into other modules are patched in each of those modules too
+DEFAULT_TARGETS = [
+    ('Reference', 'Reference', 'value'),
+    ('Component', 'Component', 'calculated_values_on_axis'),
+    ('Component', 'Component', '_Component__get_calculated_value_tuple'),
+    ('intersection_1d', None, 'get_intersection_1d'),
+    ('intersection_2d_3d', None, 'get_intersection_1d'),
+    ('finger_maker', None, 'generate_finger_joints'),
+    ('svg_writer', None, 'generate_finger_joints'),
+]
+
+
+class Instrumentation(object):
+    # nothing is patched until enable(), so the hot paths run their original code while disabled
+    def __init__(self):
+        super(Instrumentation, self).__init__()
+        self.__calls: Dict[str, int] = defaultdict(int)
+        self.__times: Dict[str, float] = defaultdict(float)
+        # calls in progress per label, only the outermost of recursive calls is timed
+        self.__depth: Dict[str, int] = defaultdict(int)
+        self.__stages: Dict[str, Dict] = {}
+        # (owner, attribute, original) of every patch, to restore them on disable()
+        self.__patches: List[Tuple[object, str, object]] = []
+
+    @property
+    def enabled(self):
+        return bool(self.__patches)
+
+    def enable(self, targets: Optional[Sequence[Tuple[str, Optional[str], str]]] = None):
+        if self.enabled:
+            return
+        targets = targets if targets is not None else DEFAULT_TARGETS
+        # every module is imported before patching, so none of them imports an already patched function
+        modules = {module_name: import_module(module_name) for module_name, _, _ in targets}
+        for module_name, class_name, attribute in targets:
+            owner = modules[module_name]
+            if class_name is not None:
+                owner = getattr(owner, class_name)
+            original = owner.__dict__[attribute]
+            if isinstance(original, property):
+                label = self.__get_label(original.fget)
+                patched = property(self.__wrap(original.fget, label), original.fset, original.fdel, original.__doc__)
+            else:
+                label = self.__get_label(original)
+                patched = self.__wrap(original, label)
+            setattr(owner, attribute, patched)
+            self.__patches.append((owner, attribute, original))
+
+    def disable(self):
+        while self.__patches:
+            owner, attribute, original = self.__patches.pop()
+            setattr(owner, attribute, original)
+
+    def reset(self):
+        self.__calls.clear()
+        self.__times.clear()
+        self.__stages.clear()
+
+    @staticmethod
+    def __get_label(function) -> str:
+        # methods by their qualified name (Component.calculated_values_on_axis), functions with their module
+        if '.' in function.__qualname__:
+            return function.__qualname__
+        return f'{function.__module__}.{function.__qualname__}'
+
+    def __wrap(self, function, label: str):
+        calls, times, depth = self.__calls, self.__times, self.__depth
+
+        def wrapper(*args, **kwargs):
+            calls[label] += 1
+            if depth[label]:
+                return function(*args, **kwargs)
+            depth[label] = 1
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                times[label] += perf_counter() - start
+                depth[label] = 0
+
+        wrapper.__wrapped__ = function
+        return wrapper
+
+    @property
+    def calls(self) -> Dict[str, int]:
+        return dict(self.__calls)
+
+    @property
+    def times(self) -> Dict[str, float]:
+        return dict(self.__times)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        # wall time of the block and the calls and time spent in each counted function meanwhile,
+        # added up when the same stage runs several times; does nothing while disabled
+        if not self.enabled:
+            yield
+            return
+        calls, times = self.calls, self.times
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - start
+            stage = self.__stages.setdefault(name, {'time': 0.0, 'runs': 0, 'calls': {}, 'times': {}})
+            stage['time'] += elapsed
+            stage['runs'] += 1
+            for label, count in self.__calls.items():
+                if count == calls.get(label, 0):
+                    continue
+                stage['calls'][label] = stage['calls'].get(label, 0) + count - calls.get(label, 0)
+                stage['times'][label] = stage['times'].get(label, 0.0) + self.__times[label] - times.get(label, 0.0)
+
+    def report(self) -> Dict:
+        return {
+            'calls': self.calls,
+            'times': self.times,
+            'stages': {name: {**stage, 'calls': dict(stage['calls']), 'times': dict(stage['times'])}
+                       for name, stage in self.__stages.items()},
+        }
+
+
+instrumentation = Instrumentation()
+
+
+@contextmanager
+def instrumented(targets: Optional[Sequence[Tuple[str, Optional[str], str]]] = None) -> Iterator[Instrumentation]:
+    # counts from a clean state within the block, the patches are removed on exit
+    instrumentation.reset()
+    instrumentation.enable(targets)
+    try:
+        yield instrumentation
+    finally:
+        instrumentation.disable()
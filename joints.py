@@ -0,0 +1,71 @@
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from Component import Component
+from contacts import build_contact_graph
+from intersection_2d_3d import get_intersection_3d
+
+
+class Joint(NamedTuple):
+    # the joint edge as seen on the panel face, with the direction of its fingers ('H' or 'V')
+    # and its config: 'INNER', 'OUTER', 'HALF_UP' or 'HALF_BOTTOM'
+    x_bounds: Tuple[float, float]
+    y_bounds: Tuple[float, float]
+    direction: str
+    config: str
+
+
+def detect_fingers_type(i1, i2, i3, labels: Tuple[str, str] = ('?', '?')):
+    if ('_WITH_' in i1[2] or '_BEFORE_' in i1[2]) and \
+            ('_WITH_' in i2[2] or '_BEFORE_' in i2[2]):
+        return 'OUTER', 'INNER'
+    if '_WITH_' in i1[2] or '_BEFORE_' in i1[2]:
+        return 'OUTER', 'INNER'
+    if '_WITH_' in i2[2] or '_BEFORE_' in i2[2]:
+        return 'INNER', 'OUTER'
+    if '_CONTAINS_' in i3[2]:
+        raise Exception(f'Invalid intersection between {labels[0]} and {labels[1]}')
+    if i3[2] in ('A_BEFORE_B', 'B_STARTS_WITH_A', 'A_ENDS_WITH_B'):
+        return 'HALF_BOTTOM', 'HALF_UP'
+    return 'HALF_UP', 'HALF_BOTTOM'
+
+
+def detect_pair_joints(i1: Component, i2: Component) -> List[Tuple[Component, Joint]]:
+    # the joints of two touching panels of different faces, one for each of them
+    if i1.face == i2.face:
+        return []
+
+    if (i1.face in 'side' and i2.face == 'front') or \
+            (i1.face in 'top' and i2.face == 'front') or \
+            (i1.face in 'top' and i2.face == 'side'):
+        i1, i2 = i2, i1
+
+    x_intersection, y_intersection, z_intersection = get_intersection_3d(i1.full_bounds, i2.full_bounds)
+    if len(x_intersection[0]) != 2 or len(y_intersection[0]) != 2 or len(z_intersection[0]) != 2:
+        return []
+
+    labels = (i1.label, i2.label)
+    if i1.face == 'front' and i2.face == 'side':
+        finger_type1, finger_type2 = detect_fingers_type(x_intersection, y_intersection, z_intersection, labels)
+        return [(i1, Joint(x_intersection[0], z_intersection[0], 'V', finger_type1)),
+                (i2, Joint(y_intersection[0], z_intersection[0], 'V', finger_type2))]
+    elif i1.face == 'front' and i2.face == 'top':
+        finger_type1, finger_type2 = detect_fingers_type(z_intersection, y_intersection, x_intersection, labels)
+        return [(i1, Joint(x_intersection[0], z_intersection[0], 'H', finger_type1)),
+                (i2, Joint(x_intersection[0], y_intersection[0], 'H', finger_type2))]
+    elif i1.face == 'side' and i2.face == 'top':
+        finger_type1, finger_type2 = detect_fingers_type(z_intersection, x_intersection, y_intersection, labels)
+        return [(i1, Joint(y_intersection[0], z_intersection[0], 'H', finger_type1)),
+                (i2, Joint(x_intersection[0], y_intersection[0], 'V', finger_type2))]
+    return []
+
+
+def detect_joints(items: Sequence[Component],
+                  contact_graph: Optional[Sequence[Set[int]]] = None) -> Dict[Component, List[Joint]]:
+    # every item is a key, in the given order, its joints follow the order of the touching pairs
+    if contact_graph is None:
+        contact_graph = build_contact_graph([item.full_bounds for item in items])
+    joints = {item: [] for item in items}
+    for i, j in sorted((i, j) for i, neighbors in enumerate(contact_graph) for j in neighbors if i < j):
+        for item, joint in detect_pair_joints(items[i], items[j]):
+            joints[item].append(joint)
+    return joints
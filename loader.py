@@ -0,0 +1,207 @@
+import ast
+import json
+import os
+from typing import Dict, List, Union
+
+from Component import Component
+from Parameter import Parameter
+from Reference import Reference
+
+PROPERTIES = ['left', 'center_x', 'right', 'width',
+              'front', 'center_y', 'back', 'depth',
+              'bottom', 'center_z', 'top', 'height']
+
+OPERATIONS = [f'{action}_{side}' for action in ('grow', 'shrink')
+              for side in ('left', 'right', 'front', 'back', 'bottom', 'top')] + \
+             ['move_left', 'move_right', 'move_forward', 'move_backward', 'move_down', 'move_up']
+
+
+class LoaderError(ValueError):
+    pass
+
+
+class _Scope(object):
+    # expressions are parsed with ast and only numbers, + - * /, parameters and `label.property` are evaluated,
+    # nothing from the file is ever executed
+    def __init__(self):
+        super(_Scope, self).__init__()
+        self.components: Dict[str, Component] = {}
+        self.parameters: Dict[str, Parameter] = {}
+
+    def evaluate(self, value: Union[int, float, str]) -> Union[int, float, Reference]:
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            raise LoaderError(f'Expected a number or an expression, got {value!r}')
+        if not isinstance(value, str):
+            return value
+        try:
+            tree = ast.parse(value, mode='eval')
+        except SyntaxError:
+            raise LoaderError(f'Invalid expression "{value}"')
+        return self.__evaluate_node(tree.body, value)
+
+    def __evaluate_node(self, node: ast.AST, source: str):
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and \
+                not isinstance(node.value, bool):
+            return node.value
+        if isinstance(node, ast.Name):
+            if node.id not in self.parameters:
+                raise LoaderError(f'Unknown parameter "{node.id}" in "{source}"')
+            return self.parameters[node.id].value
+        if isinstance(node, ast.Attribute):
+            return getattr(self.get_component(node.value, source), self.__get_property(node.attr, source))
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+            operand = self.__evaluate_node(node.operand, source)
+            return -operand if isinstance(node.op, ast.USub) else operand
+        if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.Div)):
+            left = self.__evaluate_node(node.left, source)
+            right = self.__evaluate_node(node.right, source)
+            if isinstance(node.op, ast.Add):
+                return left + right
+            if isinstance(node.op, ast.Sub):
+                return left - right
+            if isinstance(node.op, ast.Mult):
+                return left * right
+            if isinstance(right, Reference):
+                raise LoaderError(f'Division by a reference is not supported in "{source}"')
+            if right == 0:
+                raise LoaderError(f'Division by zero in "{source}"')
+            return left / right
+        raise LoaderError(f'Unsupported expression "{ast.get_source_segment(source, node) or source}"')
+
+    def get_component(self, node: ast.AST, source: str) -> Component:
+        if not isinstance(node, ast.Name):
+            raise LoaderError(f'Expected a component label in "{source}"')
+        if node.id not in self.components:
+            raise LoaderError(f'Unknown component "{node.id}" in "{source}"')
+        return self.components[node.id]
+
+    @staticmethod
+    def __get_property(name: str, source: str) -> str:
+        if name not in PROPERTIES:
+            raise LoaderError(f'Unknown property "{name}" in "{source}"')
+        return name
+
+    def run_operation(self, operation: str):
+        # `label.property = expression` or `label.move_up(expression)` and the other move/grow/shrink methods
+        if not isinstance(operation, str):
+            raise LoaderError(f'Expected an operation, got {operation!r}')
+        try:
+            tree = ast.parse(operation, mode='exec')
+        except SyntaxError:
+            raise LoaderError(f'Invalid operation "{operation}"')
+        if len(tree.body) != 1:
+            raise LoaderError(f'Expected a single operation in "{operation}"')
+        statement = tree.body[0]
+        if isinstance(statement, ast.Assign) and len(statement.targets) == 1 and \
+                isinstance(statement.targets[0], ast.Attribute):
+            target = statement.targets[0]
+            component = self.get_component(target.value, operation)
+            setattr(component, self.__get_property(target.attr, operation),
+                    self.__evaluate_node(statement.value, operation))
+            return
+        if isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Call) and \
+                isinstance(statement.value.func, ast.Attribute) and len(statement.value.args) == 1 and \
+                not statement.value.keywords:
+            call = statement.value
+            component = self.get_component(call.func.value, operation)
+            if call.func.attr not in OPERATIONS:
+                raise LoaderError(f'Unknown operation "{call.func.attr}" in "{operation}"')
+            getattr(component, call.func.attr)(self.__evaluate_node(call.args[0], operation))
+            return
+        raise LoaderError(f'Unsupported operation "{operation}"')
+
+
+def build_components(data: dict) -> List[Component]:
+    # data: {'parameters': {name: number}, 'components': [{label, thickness, face, property: value}],
+    #        'operations': [statement]}, values are numbers or expressions like "c1.left + 10"
+    # every component is created before any value is set, so expressions may reference later components
+    if not isinstance(data, dict):
+        raise LoaderError('Expected a mapping with "components"')
+    unknown = set(data) - {'parameters', 'components', 'operations'}
+    if unknown:
+        raise LoaderError(f'Unknown keys: {", ".join(sorted(unknown))}')
+
+    scope = _Scope()
+    for name, value in (data.get('parameters') or {}).items():
+        if not name.isidentifier() or isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise LoaderError(f'Invalid parameter "{name}"')
+        scope.parameters[name] = Parameter(name, value)
+
+    entries = data.get('components')
+    if not isinstance(entries, list) or not entries:
+        raise LoaderError('Expected a non empty list of components')
+    components = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise LoaderError(f'Expected a component mapping, got {entry!r}')
+        label = entry.get('label')
+        if not isinstance(label, str) or not label.isidentifier():
+            raise LoaderError(f'Invalid component label {label!r}')
+        if label in scope.components or label in scope.parameters:
+            raise LoaderError(f'Duplicate name "{label}"')
+        unknown = set(entry) - {'label', 'thickness', 'face', *PROPERTIES}
+        if unknown:
+            raise LoaderError(f'Unknown keys for component "{label}": {", ".join(sorted(unknown))}')
+        thickness = entry.get('thickness')
+        if isinstance(thickness, bool) or not isinstance(thickness, (int, float)):
+            raise LoaderError(f'Invalid thickness for component "{label}": {thickness!r}')
+        try:
+            component = Component(label, thickness, entry.get('face'))
+        except AssertionError as error:
+            raise LoaderError(f'Invalid component "{label}": {error}')
+        scope.components[label] = component
+        components.append(component)
+
+    for entry, component in zip(entries, components):
+        # widths first, like the Component constructor
+        for name in sorted((name for name in entry if name in PROPERTIES),
+                           key=lambda name: (name not in ('width', 'height', 'depth'), PROPERTIES.index(name))):
+            try:
+                setattr(component, name, scope.evaluate(entry[name]))
+            except (AssertionError, NotImplementedError, ValueError) as error:
+                raise LoaderError(f'{component.label}.{name}: {error}')
+
+    for operation in data.get('operations') or ():
+        try:
+            scope.run_operation(operation)
+        except LoaderError:
+            raise
+        except (AssertionError, NotImplementedError, ValueError) as error:
+            raise LoaderError(f'{operation}: {error}')
+    return components
+
+
+def check_components(components: List[Component]):
+    # every axis needs two values that resolve to numbers (the thickness is one of them on the axis of the face),
+    # solving does not check it and an under defined component only fails once it is rendered
+    for component in components:
+        for axis in range(3):
+            if component.is_really_well_defined_on_axis(axis):
+                continue
+            names = [name for j, name in enumerate(PROPERTIES[axis * 4:axis * 4 + 4])
+                     if component.get_conceptual_value(axis, j) is None]
+            if component.is_conceptually_under_defined_on_axis(axis):
+                raise LoaderError(f'{component.label}.{"xyz"[axis]} is under defined, '
+                                  f'set {2 - component.count_conceptual_defined_on_axis(axis)} more of '
+                                  f'{", ".join(names)}')
+            raise LoaderError(f'{component.label}.{"xyz"[axis]} references an under defined value')
+
+
+def load_data(path: str) -> dict:
+    # YAML is only imported for .yaml / .yml files
+    extension = os.path.splitext(path)[1].lower()
+    with open(path) as file:
+        if extension in ('.yaml', '.yml'):
+            import yaml
+            try:
+                return yaml.safe_load(file)
+            except yaml.YAMLError as error:
+                raise LoaderError(f'Invalid YAML: {error}')
+        try:
+            return json.load(file)
+        except json.JSONDecodeError as error:
+            raise LoaderError(f'Invalid JSON: {error}')
+
+
+def load_components(path: str) -> List[Component]:
+    return build_components(load_data(path))
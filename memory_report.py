@@ -0,0 +1,44 @@
+import sys
+import tracemalloc
+
+from Component import Component
+
+
+def build_components(count: int):
+    # rows of side panels, each referencing the previous one like the panels of a cabinet run
+    components = []
+    previous = None
+    for i in range(count):
+        if previous is None or i % 50 == 0:
+            previous = Component(f'p{i}', 18, 'side', left=i % 5000, front=0, depth=500, bottom=0, height=2000)
+        else:
+            previous = Component(f'p{i}', 18, 'side', left=previous.right, front=previous.front, depth=500,
+                                 bottom=previous.bottom, height=2000)
+        components.append(previous)
+    return components
+
+
+def measure_component_memory(count: int = 100_000):
+    tracemalloc.start()
+    try:
+        components = build_components(count)
+        built, _ = tracemalloc.get_traced_memory()
+        for component in components:
+            component.full_bounds
+        solved, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'components': count,
+        'bytes_per_component': built / count,
+        'bytes_per_solved_component': solved / count,
+        'peak_bytes': peak,
+    }
+
+
+if __name__ == "__main__":
+    report = measure_component_memory(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
+    print(f'components:                 {report["components"]}')
+    print(f'bytes per component:        {report["bytes_per_component"]:.0f}')
+    print(f'bytes per solved component: {report["bytes_per_solved_component"]:.0f}')
+    print(f'peak:                       {report["peak_bytes"] / 2 ** 20:.1f} MiB')
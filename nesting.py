@@ -0,0 +1,197 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from Component import Component
+
+Size = Tuple[float, float]
+# (x, y, width, height)
+Rect = Tuple[float, float, float, float]
+
+
+class Placement(NamedTuple):
+    key: Hashable
+    x: float
+    y: float
+    width: float
+    height: float
+    rotated: bool
+
+
+class Sheet(ABC):
+    # free rect bookkeeping shared by the packers, subclasses choose the free rect and how it is split
+    __slots__ = ('width', 'height', 'thickness', 'spacing', 'placements', 'used_area', '_free', '_largest_free_area')
+
+    def __init__(self, width: float, height: float, thickness: Union[int, float], spacing: float = 0):
+        super(Sheet, self).__init__()
+        self.width = width
+        self.height = height
+        self.thickness = thickness
+        # kept on the right and top of every panel, the sheet is grown by it so panels may still reach its edges
+        self.spacing = spacing
+        self.placements: List[Placement] = []
+        self.used_area = 0
+        self._free: List[Rect] = [(0, 0, width + spacing, height + spacing)]
+        # upper bound of the area left in a single free rect, lets full sheets be skipped without a scan
+        self._largest_free_area = (width + spacing) * (height + spacing)
+
+    @property
+    def utilization(self):
+        return self.used_area / (self.width * self.height)
+
+    @abstractmethod
+    def _score(self, free: Rect, width: float, height: float):
+        # lower is better, compared between the free rects that fit the panel
+        pass
+
+    @abstractmethod
+    def _split(self, free_index: int, placed: Rect):
+        # updates the free rects after the placed rect was taken from the one at free_index
+        pass
+
+    def insert(self, key: Hashable, width: float, height: float, allow_rotation: bool = True) -> Optional[Placement]:
+        spacing = self.spacing
+        if (width + spacing) * (height + spacing) > self._largest_free_area:
+            return None
+        sizes = [(width, height, False)]
+        if allow_rotation and width != height:
+            sizes.append((height, width, True))
+        best = None
+        for free_index, free in enumerate(self._free):
+            for size_width, size_height, rotated in sizes:
+                needed_width = size_width + spacing
+                needed_height = size_height + spacing
+                if needed_width > free[2] or needed_height > free[3]:
+                    continue
+                score = self._score(free, needed_width, needed_height)
+                if best is None or score < best[0]:
+                    best = score, free_index, size_width, size_height, rotated
+        if best is None:
+            self._largest_free_area = max((free[2] * free[3] for free in self._free), default=0)
+            return None
+        _, free_index, size_width, size_height, rotated = best
+        x, y = self._free[free_index][:2]
+        placement = Placement(key, x, y, size_width, size_height, rotated)
+        self.placements.append(placement)
+        self.used_area += size_width * size_height
+        self._split(free_index, (x, y, size_width + spacing, size_height + spacing))
+        return placement
+
+
+class GuillotineSheet(Sheet):
+    # best area fit, every placement splits its free rect in two along the shorter leftover axis
+    __slots__ = ()
+
+    def _score(self, free: Rect, width: float, height: float):
+        return free[2] * free[3] - width * height, min(free[2] - width, free[3] - height)
+
+    def _split(self, free_index: int, placed: Rect):
+        x, y, free_width, free_height = self._free.pop(free_index)
+        _, _, width, height = placed
+        if free_width - width <= free_height - height:
+            parts = [(x + width, y, free_width - width, height), (x, y + height, free_width, free_height - height)]
+        else:
+            parts = [(x + width, y, free_width - width, free_height), (x, y + height, width, free_height - height)]
+        self._free.extend(part for part in parts if part[2] > 0 and part[3] > 0)
+
+
+class MaxRectsSheet(Sheet):
+    # best short side fit, free rects are the maximal empty rects and may overlap each other
+    __slots__ = ()
+
+    def _score(self, free: Rect, width: float, height: float):
+        leftover_width = free[2] - width
+        leftover_height = free[3] - height
+        return min(leftover_width, leftover_height), max(leftover_width, leftover_height)
+
+    def _split(self, free_index: int, placed: Rect):
+        px, py, pw, ph = placed
+        px2, py2 = px + pw, py + ph
+        free_rects = []
+        for free in self._free:
+            x, y, width, height = free
+            x2, y2 = x + width, y + height
+            if px >= x2 or px2 <= x or py >= y2 or py2 <= y:
+                free_rects.append(free)
+                continue
+            if px > x:
+                free_rects.append((x, y, px - x, height))
+            if px2 < x2:
+                free_rects.append((px2, y, x2 - px2, height))
+            if py > y:
+                free_rects.append((x, y, width, py - y))
+            if py2 < y2:
+                free_rects.append((x, py2, width, y2 - py2))
+        self._free = self.__prune(free_rects)
+
+    @staticmethod
+    def __prune(free_rects: List[Rect]) -> List[Rect]:
+        # drops the rects contained in another one, larger rects first so each one is only checked against keepers
+        free_rects.sort(key=lambda rect: rect[2] * rect[3], reverse=True)
+        kept = []
+        for rect in free_rects:
+            x, y, width, height = rect
+            if not any(other[0] <= x and other[1] <= y and x + width <= other[0] + other[2] and
+                       y + height <= other[1] + other[3] for other in kept):
+                kept.append(rect)
+        return kept
+
+
+NESTING_METHODS = {'guillotine': GuillotineSheet, 'maxrects': MaxRectsSheet}
+
+
+def nest_panels(panels: Iterable[Tuple[Hashable, Union[int, float], float, float]],
+                sheet_size: Union[Size, Dict[Union[int, float], Size]], method: str = 'maxrects',
+                allow_rotation: bool = True, spacing: float = 0) -> Dict[Union[int, float], List[Sheet]]:
+    # panels are (key, thickness, width, height), sheet_size is one size or a size per thickness
+    # panels of each thickness are placed largest first on the first sheet they fit, a new sheet is opened otherwise
+    assert method in NESTING_METHODS, f'Nesting method must be one of {", ".join(NESTING_METHODS)}'
+    sheet_class = NESTING_METHODS[method]
+    by_thickness: Dict[Union[int, float], List[Tuple[Hashable, float, float]]] = {}
+    for key, thickness, width, height in panels:
+        by_thickness.setdefault(thickness, []).append((key, width, height))
+
+    sheets_by_thickness = {}
+    for thickness in sorted(by_thickness):
+        sheet_width, sheet_height = sheet_size[thickness] if isinstance(sheet_size, dict) else sheet_size
+        thickness_panels = sorted(by_thickness[thickness], key=lambda panel: (-max(panel[1:]), -min(panel[1:])))
+        sheets = []
+        for key, width, height in thickness_panels:
+            for sheet in sheets:
+                if sheet.insert(key, width, height, allow_rotation) is not None:
+                    break
+            else:
+                sheet = sheet_class(sheet_width, sheet_height, thickness, spacing)
+                if sheet.insert(key, width, height, allow_rotation) is None:
+                    raise ValueError(f'Panel {key} of {width} x {height} does not fit on a '
+                                     f'{sheet_width} x {sheet_height} sheet')
+                sheets.append(sheet)
+        sheets_by_thickness[thickness] = sheets
+    return sheets_by_thickness
+
+
+def nest_components(components: Iterable[Component], sheet_size: Union[Size, Dict[Union[int, float], Size]],
+                    method: str = 'maxrects', allow_rotation: bool = True,
+                    spacing: float = 0) -> Dict[Union[int, float], List[Sheet]]:
+    panels = []
+    for component in components:
+        (x1, x2), (y1, y2) = component.bounds_on_face()
+        panels.append((component, component.thickness, x2 - x1, y2 - y1))
+    return nest_panels(panels, sheet_size, method, allow_rotation, spacing)
+
+
+def get_nesting_report(sheets_by_thickness: Dict[Union[int, float], List[Sheet]]) -> dict:
+    by_thickness = {}
+    for thickness, sheets in sheets_by_thickness.items():
+        sheet_area = sum(sheet.width * sheet.height for sheet in sheets)
+        by_thickness[thickness] = {
+            'sheets': len(sheets),
+            'panels': sum(len(sheet.placements) for sheet in sheets),
+            'utilization': sum(sheet.used_area for sheet in sheets) / sheet_area if sheet_area else 0,
+        }
+    total_area = sum(sheet.width * sheet.height for sheets in sheets_by_thickness.values() for sheet in sheets)
+    used_area = sum(sheet.used_area for sheets in sheets_by_thickness.values() for sheet in sheets)
+    return {
+        'sheets': sum(report['sheets'] for report in by_thickness.values()),
+        'utilization': used_area / total_area if total_area else 0,
+        'by_thickness': by_thickness,
+    }
@@ -0,0 +1,75 @@
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, Optional, Sequence, TextIO, Tuple
+
+from Component import Component
+from contacts import THICKNESS_AXES
+from svg_writer import PanelCutouts, PanelJoint, Rect, get_panel_cutouts, write_lines
+
+# (x, y, z) of a panel: its lower corner or its size
+Point = Tuple[float, float, float]
+
+# axes of the face plane coordinates, as used by Component.bounds_on_face
+FACE_AXES = {'side': (1, 2), 'top': (0, 1), 'front': (0, 2)}
+
+# cutouts go slightly through the panel, so OpenSCAD does not leave a skin on coplanar faces
+CUTOUT_MARGIN = 0.01
+
+
+def scad_cube(corner: Sequence[float], size: Sequence[float], indent: str = '') -> str:
+    return f'{indent}translate([{corner[0]}, {corner[1]}, {corner[2]}])\n' \
+           f'{indent}   cube([{size[0]}, {size[1]}, {size[2]}]);\n'
+
+
+def get_relative_cutouts(face: str, corner: Point, cutouts: PanelCutouts) -> PanelCutouts:
+    # cutouts of the face moved to the panel corner
+    x_axis, y_axis = FACE_AXES[face]
+    return tuple(tuple((x - corner[x_axis], y - corner[y_axis], width, height) for x, y, width, height in rects)
+                 for rects in cutouts)
+
+
+def get_cutout_box(face: str, size: Point, rect: Rect) -> Tuple[Tuple[float, float], ...]:
+    # a cutout of the face relative to the panel corner, extruded through the panel thickness
+    x, y, width, height = rect
+    x_axis, y_axis = FACE_AXES[face]
+    thickness_axis = THICKNESS_AXES[face]
+    box = [None, None, None]
+    box[x_axis] = (x, x + width)
+    box[y_axis] = (y, y + height)
+    box[thickness_axis] = (-CUTOUT_MARGIN, size[thickness_axis] + CUTOUT_MARGIN)
+    return tuple(box)
+
+
+def render_panel(face: str, size: Point, cutouts: PanelCutouts = ()) -> str:
+    # the panel at the origin, the caller translates it to its corner
+    boxes = [get_cutout_box(face, size, rect) for rects in cutouts for rect in rects]
+    if not boxes:
+        return f'    cube([{size[0]}, {size[1]}, {size[2]}]);\n'
+    return '    difference() {\n' + f'      cube([{size[0]}, {size[1]}, {size[2]}]);\n' + \
+        ''.join(scad_cube([lower for lower, _ in box], [upper - lower for lower, upper in box], '      ')
+                for box in boxes) + '    }\n'
+
+
+def iter_scad_cutout_lines(panels: Iterable[Tuple[Component, PanelCutouts]], cache_size: int = 1024) -> Iterator[str]:
+    # fragments depend on the face, size and relative cutouts only, so panels repeated across the assembly are
+    # rendered once; the cache lives for this render only
+    render = lru_cache(maxsize=cache_size)(render_panel)
+    yield 'union() {\n'
+    for component, cutouts in panels:
+        values = [component.calculated_values_on_axis(axis) for axis in range(3)]
+        corner = (values[0][0], values[1][0], values[2][0])
+        size = (values[0][3], values[1][3], values[2][3])
+        yield f'  translate([{corner[0]}, {corner[1]}, {corner[2]}])\n'
+        yield render(component.face, size, get_relative_cutouts(component.face, corner, cutouts))
+    yield '}\n'
+
+
+def iter_scad_lines(components: Iterable[Component],
+                    joints: Optional[Dict[Component, Sequence[PanelJoint]]] = None) -> Iterator[str]:
+    return iter_scad_cutout_lines((component, get_panel_cutouts(joints.get(component, ()) if joints else ()))
+                                  for component in components)
+
+
+def write_scad(components: Iterable[Component], joints: Optional[Dict[Component, Sequence[PanelJoint]]] = None,
+               target: Optional[TextIO] = None, buffer_size: int = 1 << 16):
+    # the whole assembly as one union(), panels with joints get their finger cutouts subtracted
+    write_lines(iter_scad_lines(components, joints), target, buffer_size)
@@ -0,0 +1,137 @@
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from finger_maker import generate_finger_joints
+
+Bounds = Tuple[float, float]
+FaceBounds = Tuple[Bounds, Bounds]
+# a joint as seen on the panel face: x bounds, y bounds, fingers direction ('H' or 'V') and finger config
+PanelJoint = Tuple[Bounds, Bounds, str, str]
+# (x, y, width, height) on the panel face
+Rect = Tuple[float, float, float, float]
+# the cutout rects of each INNER/OUTER joint of a panel
+PanelCutouts = Tuple[Tuple[Rect, ...], ...]
+
+FINGER_LENGTH = 4.3 * 2
+
+
+def iter_cutout_rects(x_bounds: Bounds, y_bounds: Bounds, fingers_direction: str,
+                      finger_config: str) -> Iterator[Rect]:
+    # the rect of each space between the fingers of a joint
+    if finger_config not in ('INNER', 'OUTER'):
+        return  # TODO: to be removed!
+    width = x_bounds[1] - x_bounds[0]
+    height = y_bounds[1] - y_bounds[0]
+    fingers_total_length = width if fingers_direction == 'H' else height
+    finger_data = generate_finger_joints(fingers_total_length, FINGER_LENGTH, FINGER_LENGTH,
+                                         'space' if finger_config == 'OUTER' else 'finger',
+                                         'space' if finger_config == 'OUTER' else 'finger',
+                                         "grow_both")
+    for finger in finger_data:
+        if finger['type'] == 'FINGER':
+            continue
+        if fingers_direction == 'H':
+            yield x_bounds[0] + finger["start"], y_bounds[0], finger["length"], height
+        else:
+            yield x_bounds[0], y_bounds[0] + finger["start"], width, finger["length"]
+
+
+def get_panel_cutouts(joints: Iterable[PanelJoint]) -> PanelCutouts:
+    return tuple(tuple(iter_cutout_rects(*joint)) for joint in joints
+                 if joint[3] in ('INNER', 'OUTER'))  # TODO: to be removed!
+
+
+def iter_panel_cutout_lines(face_bounds: FaceBounds, cutouts: PanelCutouts) -> Iterator[str]:
+    # the panel outline followed by one group of cutouts per joint
+    (x1, x2), (y1, y2) = face_bounds
+    yield '<g>\n'
+    yield f'  <rect x="{x1}" y="{y1}" width="{x2 - x1}" height="{y2 - y1}" fill="none" stroke="black" />\n'
+    for rects in cutouts:
+        yield '  <g>\n'
+        for x, y, width, height in rects:
+            yield f'    <rect x="{x}" y="{y}" width="{width}" height="{height}" fill="nore" stroke="red" />\n'
+        yield '  </g>\n'
+    yield '</g>\n'
+
+
+def iter_panel_lines(face_bounds: FaceBounds, joints: Iterable[PanelJoint]) -> Iterator[str]:
+    return iter_panel_cutout_lines(face_bounds, get_panel_cutouts(joints))
+
+
+def render_panels(panels: List[Tuple[FaceBounds, Sequence[PanelJoint]]]) -> str:
+    # runs in the worker processes, so it only gets and returns plain data
+    return ''.join(line for face_bounds, joints in panels for line in iter_panel_lines(face_bounds, joints))
+
+
+def compact_panel(face_bounds: FaceBounds, joints: Iterable[PanelJoint]) -> Tuple[FaceBounds, Tuple[PanelJoint, ...]]:
+    # plain tuples of floats and strings are cheap to pickle and need no import of the joint types in the workers
+    (x1, x2), (y1, y2) = face_bounds
+    return ((x1, x2), (y1, y2)), tuple(((x_bounds[0], x_bounds[1]), (y_bounds[0], y_bounds[1]), direction, config)
+                                       for x_bounds, y_bounds, direction, config in joints)
+
+
+def iter_svg_fragments_parallel(panels: Iterable[Tuple[FaceBounds, Iterable[PanelJoint]]],
+                                max_workers: Optional[int] = None, chunk_size: int = 64) -> Iterator[str]:
+    # panels are sent to the workers in chunks, fragments come back in the order of the panels
+    # only a few chunks per worker are in flight at a time, so memory stays bounded on any number of panels
+    panels = (compact_panel(face_bounds, joints) for face_bounds, joints in panels)
+    yield '<svg xmlns="http://www.w3.org/2000/svg">\n'
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    in_flight = 4 * max_workers
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        while True:
+            while len(pending) < in_flight:
+                chunk = list(islice(panels, chunk_size))
+                if not chunk:
+                    break
+                pending.append(executor.submit(render_panels, chunk))
+            if not pending:
+                break
+            yield pending.popleft().result()
+    yield '</svg>\n'
+
+
+def iter_svg_cutout_lines(panels: Iterable[Tuple[FaceBounds, PanelCutouts]]) -> Iterator[str]:
+    # panels are consumed one at a time, nothing but the current panel is held in memory
+    yield '<svg xmlns="http://www.w3.org/2000/svg">\n'
+    for face_bounds, cutouts in panels:
+        yield from iter_panel_cutout_lines(face_bounds, cutouts)
+    yield '</svg>\n'
+
+
+def iter_svg_lines(panels: Iterable[Tuple[FaceBounds, Iterable[PanelJoint]]]) -> Iterator[str]:
+    return iter_svg_cutout_lines((face_bounds, get_panel_cutouts(joints)) for face_bounds, joints in panels)
+
+
+def write_lines(lines: Iterable[str], target: Optional[TextIO] = None, buffer_size: int = 1 << 16):
+    # lines are joined into chunks of about buffer_size characters, so the target sees few large writes
+    if target is None:
+        target = sys.stdout
+    chunk = []
+    chunk_size = 0
+    for line in lines:
+        chunk.append(line)
+        chunk_size += len(line)
+        if chunk_size >= buffer_size:
+            target.write(''.join(chunk))
+            chunk.clear()
+            chunk_size = 0
+    if chunk:
+        target.write(''.join(chunk))
+
+
+def write_svg(panels: Iterable[Tuple[FaceBounds, Sequence[PanelJoint]]], target: Optional[TextIO] = None,
+              buffer_size: int = 1 << 16):
+    write_lines(iter_svg_lines(panels), target, buffer_size)
+
+
+def write_svg_parallel(panels: Iterable[Tuple[FaceBounds, Iterable[PanelJoint]]], target: Optional[TextIO] = None,
+                       buffer_size: int = 1 << 16, max_workers: Optional[int] = None, chunk_size: int = 64):
+    # same output as write_svg, the panels are rendered on a process pool of max_workers (all cores by default)
+    write_lines(iter_svg_fragments_parallel(panels, max_workers, chunk_size), target, buffer_size)
@@ -0,0 +1,143 @@
+from typing import Dict, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+from Assembly import Assembly
+from collision import find_collisions
+from Component import Component
+from ComponentStore import AXIS_NAMES, FACES, solve_axes
+from Parameter import Parameter
+from Reference import Reference
+
+# candidate pairs compared at once, for each chunk of variants
+OVERLAP_PAIRS = 256
+
+
+class SweepResult(NamedTuple):
+    # bounds: (V, N, 3, 2), collision_counts and joint_counts: (V,), collisions: (V,) bool
+    bounds: np.ndarray
+    collisions: np.ndarray
+    collision_counts: np.ndarray
+    joint_counts: np.ndarray
+
+
+def grid(parameters: Dict[Parameter, Sequence[float]]) -> Dict[Parameter, np.ndarray]:
+    # every combination of the given values, as flat arrays of one value per variant
+    if not parameters:
+        return {}
+    arrays = np.meshgrid(*[np.asarray(values, dtype=float) for values in parameters.values()], indexing='ij')
+    return {parameter: array.reshape(-1) for parameter, array in zip(parameters, arrays)}
+
+
+class _Sweep(object):
+    def __init__(self, components: Sequence[Component], parameters: Dict[Parameter, np.ndarray], variants: int):
+        super(_Sweep, self).__init__()
+        self.components = components
+        self.indices = {component: index for index, component in enumerate(components)}
+        self.parameters = parameters
+        self.variants = variants
+        # solved values as the *_value properties expose them, unset slots of under defined axes are nan
+        self.exposed = np.full((variants, len(components), 3, 4), np.nan)
+
+    def evaluate(self, value) -> Union[float, np.ndarray]:
+        # same arithmetic as Reference.value, on one value per variant
+        if not isinstance(value, Reference):
+            return value
+        index = self.indices.get(value.owner)
+        if index is not None:
+            axis = Component.get_axis(value.prop)
+            result = self.exposed[:, index, axis, AXIS_NAMES[axis].index(value.prop)]
+        elif value.owner in self.parameters:
+            result = self.parameters[value.owner]
+        else:
+            result = value.owner_value
+            result = np.nan if result is None else result
+        for op, other in value.ops:
+            other_value = self.evaluate(other)
+            if op == '+':
+                result = result + other_value
+            elif op == '-':
+                result = other_value - result
+            elif op == '*':
+                result = result * other_value
+            elif op == '_':
+                result = other_value / result
+        return result
+
+    def solve(self, component: Component, axis: int, thickness: Union[float, np.ndarray]) -> np.ndarray:
+        # one axis of the component for every variant, the axes it references must already be exposed
+        face_axis = FACES.index(component.face)
+        values = np.full((self.variants, 4), np.nan)
+        defined = np.zeros(4, dtype=bool)
+        offsets = np.zeros(self.variants)
+        for j in range(4):
+            value = thickness if axis == face_axis and j == 3 else component.get_user_value(axis, j)
+            if value is not None:
+                values[:, j] = self.evaluate(value)
+                defined[j] = True
+        offsets[:] = self.evaluate(component.get_offset(axis))
+
+        real_defined = defined & ~np.isnan(values)
+        solved = solve_axes(values, real_defined, offsets)
+        user_defined = defined.copy()
+        if axis == face_axis:
+            user_defined[3] = False
+        under_defined = defined.sum() < 2
+        self.exposed[:, self.indices[component], axis] = np.where(under_defined & ~user_defined, np.nan, solved)
+        return solved
+
+
+def sweep(template: Union[Assembly, Sequence[Component]], parameters: Dict[Parameter, Sequence[float]],
+          thicknesses: Optional[Dict[Component, Union[Parameter, float]]] = None,
+          chunk_size: int = 1024) -> SweepResult:
+    # evaluates the template for every variant at once: variant v uses parameters[p][v] wherever p.value is
+    # referenced, parameters that are not given keep their own value
+    # thicknesses may replace the thickness of some components by a parameter or a number
+    if isinstance(template, Assembly):
+        components, order = template.components, template.axis_order()
+    else:
+        # the template components must not keep the listener of this throwaway assembly
+        with Assembly(template) as assembly:
+            components, order = assembly.components, assembly.axis_order()
+    thicknesses = thicknesses or {}
+    parameters = {parameter: np.asarray(values, dtype=float) for parameter, values in parameters.items()}
+    arrays = np.broadcast_arrays(*parameters.values()) if parameters else []
+    parameters = {parameter: np.asarray(array, dtype=float).reshape(-1) for parameter, array in zip(parameters, arrays)}
+    variants = len(next(iter(parameters.values()))) if parameters else 1
+
+    state = _Sweep(components, parameters, variants)
+    solved = np.full((variants, len(components), 3, 4), np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # axis by axis with referenced axes first, an axis may reference another axis of the same component
+        for component, axis in order:
+            thickness = thicknesses.get(component, component.thickness)
+            thickness = state.evaluate(thickness.value if isinstance(thickness, Parameter) else thickness)
+            solved[:, state.indices[component], axis] = state.solve(component, axis, thickness)
+    bounds = solved[:, :, :, [0, 2]]
+
+    # pairs of the same face must not overlap, pairs of different faces overlapping on every axis are jointed
+    # a pair can only overlap in some variant if its boxes spanning all the variants overlap, so one broad phase
+    # over the spanning boxes gives the only pairs worth comparing
+    with np.errstate(invalid='ignore'):
+        spanning = np.stack([np.fmin.reduce(bounds[..., 0], axis=0), np.fmax.reduce(bounds[..., 1], axis=0)], axis=-1)
+    candidates = find_collisions(spanning)
+    faces = np.array([FACES.index(component.face) for component in components], dtype=np.int64)
+    same_face = faces[candidates[:, 0]] == faces[candidates[:, 1]]
+    collision_counts = _count_overlaps(bounds, candidates[same_face], chunk_size)
+    # every jointed pair gives one joint to each of its panels
+    joint_counts = 2 * _count_overlaps(bounds, candidates[~same_face], chunk_size)
+    return SweepResult(bounds, collision_counts > 0, collision_counts, joint_counts)
+
+
+def _count_overlaps(bounds: np.ndarray, pairs: np.ndarray, chunk_size: int) -> np.ndarray:
+    # number of pairs whose boxes overlap with a positive volume, per variant
+    # variants and pairs are both chunked, so at most chunk_size x OVERLAP_PAIRS comparisons are held at once
+    counts = np.zeros(len(bounds), dtype=np.int64)
+    for start in range(0, len(bounds), chunk_size):
+        chunk = bounds[start:start + chunk_size]
+        for pair_start in range(0, len(pairs), OVERLAP_PAIRS):
+            first, second = pairs[pair_start:pair_start + OVERLAP_PAIRS].T
+            a, b = chunk[:, first], chunk[:, second]
+            overlap = np.all((a[..., 0] < b[..., 1]) & (b[..., 0] < a[..., 1]), axis=-1)
+            counts[start:start + chunk_size] += overlap.sum(axis=-1)
+    return counts
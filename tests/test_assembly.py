@@ -0,0 +1,64 @@
+
+from Assembly import Assembly
+from Component import Component
+
+
+def make(label: str):
+    return Component(label, 4, 'front', left=0, right=100, front=0, bottom=0, height=100)
+
+
+def test_components_referencing_each_other_on_different_axes():
+    a, b = make('a'), make('b')
+    b.left = 10
+    a.left = b.left
+    b.bottom = a.bottom
+    assembly = Assembly([a, b])
+    assert set(assembly.solve()) == {a, b}
+    assert assembly.bounds == {a: [(10, 100), (0, 4), (0, 100)], b: [(10, 100), (0, 4), (0, 100)]}
+    b.move_up(5)
+    assert assembly.solve() == [b]
+    assert assembly.get_bounds(b) == [(10, 100), (0, 4), (5, 105)]
+
+
+def test_axis_order_puts_referenced_axes_first():
+    a, b = make('a'), make('b')
+    a.left = b.left
+    b.bottom = a.bottom
+    order = Assembly([a, b]).axis_order()
+    assert order.index((b, 0)) < order.index((a, 0))
+    assert order.index((a, 2)) < order.index((b, 2))
+
+
+def test_closed_pipelines_do_not_keep_listeners():
+    from Pipeline import Pipeline
+    a, b = make('a'), make('b')
+    b.bottom = a.top
+    for _ in range(10):
+        with Pipeline([a, b]) as pipeline:
+            assert pipeline.bounds[b][2] == (100, 200)
+    assert a._Component__listeners == b._Component__listeners == ()
+
+    # an assembly given to the pipeline is left open
+    with Assembly([a, b]) as assembly:
+        Pipeline(assembly).close()
+        assert len(a._Component__listeners) == 1
+        assembly.solve()
+    assert a._Component__listeners == () and len(assembly) == 0
+
+
+def test_rewiring_a_reference_reorders_the_solve():
+    a, b, c = make('a'), make('b'), make('c')
+    for item in (a, b, c):
+        item.right = None
+        item.width = 100
+    b.left = a.right
+    c.left = b.right
+    assembly = Assembly([c, b, a])
+    assembly.solve()
+    # the x axis of a now depends on c, so it moves behind the axes it used to come before
+    b.left = 10
+    a.left = c.right
+    assert set(assembly.solve()) == {a, b, c}
+    assert [assembly.get_bounds(item)[0] for item in (a, b, c)] == [(210, 310), (10, 110), (110, 210)]
+    order = assembly.axis_order()
+    assert order.index((b, 0)) < order.index((c, 0)) < order.index((a, 0))
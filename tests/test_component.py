@@ -0,0 +1,32 @@
+import pytest
+
+from Component import Component
+
+
+def make(label: str):
+    return Component(label, 4, 'front', left=0, right=100, front=0, bottom=0, height=100)
+
+
+def test_references_across_axes_are_not_cycles():
+    a, b = make('a'), make('b')
+    a.left = b.left
+    b.bottom = a.bottom
+    assert a.full_bounds == b.full_bounds
+
+
+def test_reference_to_another_axis_of_the_same_component():
+    d = Component('d', 4, 'front', left=0, right=100, front=0, bottom=0)
+    d.height = d.width
+    assert d.full_bounds == [(0, 100), (0, 4), (0, 100)]
+
+
+def test_circular_references_are_rejected():
+    a, b, c = make('a'), make('b'), make('c')
+    a.left = b.left
+    b.left = c.right
+    with pytest.raises(ValueError, match=r'Circular reference: c\.x -> a\.x -> b\.x -> c\.x'):
+        c.left = a.right
+    with pytest.raises(ValueError, match='references itself'):
+        a.right = a.left + 10
+    c.bottom = a.top
+    assert c.full_bounds == [(0, 100), (0, 4), (100, 200)]
@@ -0,0 +1,81 @@
+import random
+
+import numpy as np
+import pytest
+
+from Component import Component
+from ComponentStore import ComponentStore
+
+
+def assert_store_matches(components):
+    store = ComponentStore.from_components(components)
+    expected = np.array([component.full_bounds for component in components], dtype=float)
+    np.testing.assert_allclose(store.bounds, expected)
+
+
+def test_reference_to_another_axis_of_the_same_component():
+    d = Component('d', 4, 'front', left=0, right=100, bottom=0)
+    d.height = d.width
+    d.front = d.top - 50
+    assert_store_matches([d])
+
+
+def test_components_referencing_each_other_on_different_axes():
+    a = Component('a', 4, 'front', left=0, right=100, front=0, bottom=0, height=100)
+    b = Component('b', 18, 'side', left=200, front=0, depth=300, bottom=10, height=100)
+    a.left = b.left + 10
+    b.bottom = a.bottom
+    a.front = b.bottom + 5
+    assert_store_matches([a, b])
+
+
+def test_random_rows_match_the_component_solver():
+    generator = random.Random(0)
+    for _ in range(20):
+        components = []
+        for i in range(30):
+            component = Component(f'p{i}', 18, 'side', front=0, depth=generator.randint(100, 500), bottom=0)
+            if components:
+                previous = generator.choice(components)
+                component.left = previous.right + generator.randint(0, 50)
+                component.height = previous.height * 0.5 + generator.randint(0, 10)
+            else:
+                component.left = 0
+                component.height = 1000
+            if generator.random() < 0.3:
+                component.depth = None
+                component.back = component.top
+            components.append(component)
+        assert_store_matches(components)
+
+
+def test_long_chains_of_links_match_the_component_solver():
+    generator = random.Random(1)
+    components = [Component('p0', 18, 'front', left=5, width=300, front=0, bottom=0, height=700)]
+    components[0].move_up(3)
+    for i in range(1, 500):
+        previous = components[-1]
+        component = Component(f'p{i}', 18, 'front', width=generator.randint(100, 500), front=0, height=700)
+        # left, center or right, from the left, center or right of the previous one, scaled or not
+        setattr(component, generator.choice(['left', 'center_x', 'right']),
+                getattr(previous, generator.choice(['left', 'center_x', 'right'])) * generator.choice([1, 1, 2]) +
+                generator.randint(0, 50))
+        component.bottom = previous.bottom + 0.5
+        component.move_right(generator.randint(0, 10))
+        components.append(component)
+    # a size read from a chained component, and a chain of positions and sizes that cannot be collapsed
+    components[10].width = None
+    components[10].right = components[5].width + components[9].right
+    components[20].height = None
+    components[20].top = components[19].top * 2
+    assert_store_matches(components)
+
+
+def test_circular_links_are_rejected():
+    store = ComponentStore()
+    a = store.add('a', 18, 'front', width=100, front=0, bottom=0, height=100)
+    b = store.add('b', 18, 'front', width=100, front=0, bottom=0, height=100)
+    a.left = b.right
+    b.left = a.right + 10
+    with pytest.raises(ValueError, match='Circular reference'):
+        store.solve()
@@ -0,0 +1,20 @@
+from dxf_writer import get_layer_name, get_outline_loops, iter_dxf_cutout_lines
+
+
+def test_edge_notches_are_part_of_a_single_outline():
+    loops = get_outline_loops(((0, 10), (0, 10)), (((2, 0, 2, 1), (6, 0, 2, 1)), ((0, 0, 1, 10),)))
+    assert len(loops) == 1
+    assert sorted(loops[0]) == sorted([(1, 0), (2, 0), (2, 1), (4, 1), (4, 0), (6, 0), (6, 1), (8, 1), (8, 0),
+                                       (10, 0), (10, 10), (1, 10)])
+
+
+def test_inner_cutouts_and_split_material_give_their_own_loops():
+    assert len(get_outline_loops(((0, 10), (0, 10)), (((4, 4, 2, 2),),))) == 2
+    assert len(get_outline_loops(((0, 4), (0, 4)), (((0, 0, 2, 2), (2, 2, 2, 2)),))) == 2
+
+
+def test_layer_names_do_not_depend_on_the_number_type():
+    assert get_layer_name(18) == get_layer_name(18.0) == 'THICKNESS_18'
+    assert get_layer_name(4.3) == 'THICKNESS_4_3'
+    text = ''.join(iter_dxf_cutout_lines([(18.0, ((0, 10), (0, 10)), ())], {18}))
+    assert text.count('THICKNESS_18\n') == 1 + 5 + 1
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+import cli
+from loader import LoaderError, build_components, check_components, load_components
+
+
+def panel(label: str, **values):
+    return {'label': label, 'thickness': 18, 'face': 'front', 'front': 0, 'bottom': 0, 'height': 100, **values}
+
+
+def test_expressions_reference_parameters_and_later_components():
+    a, b = build_components({
+        'parameters': {'gap': 5},
+        'components': [panel('a', left='b.right + gap', width='b.width / 2'), panel('b', left=0, width=200)],
+        'operations': ['b.move_up(gap * 2)', 'a.height = b.height - 10'],
+    })
+    check_components([a, b])
+    assert a.full_bounds == [(205, 305), (0, 18), (0, 90)]
+    assert b.full_bounds == [(0, 200), (0, 18), (10, 110)]
+
+
+@pytest.mark.parametrize('expression', [
+    '__import__("os").system("true")',
+    'a.left.__class__',
+    '(lambda: 1)()',
+    'a.__dict__',
+    'open("x")',
+    '2 ** 3',
+    '"text"',
+    'a.left if 1 else 0',
+])
+def test_expressions_outside_the_grammar_are_rejected(expression):
+    with pytest.raises(LoaderError):
+        build_components({'components': [panel('a', left=0, width=100), panel('b', right=expression, width=10)]})
+
+
+@pytest.mark.parametrize('operation', [
+    'import os',
+    'a.left = 1; a.right = 2',
+    'a.__class__ = None',
+    'a.delete()',
+    'a.move_up(1, 2)',
+    'b.move_up(1)',
+    'a.move_up(x=1)',
+])
+def test_operations_outside_the_grammar_are_rejected(operation):
+    with pytest.raises(LoaderError):
+        build_components({'components': [panel('a', left=0, width=100)], 'operations': [operation]})
+
+
+@pytest.mark.parametrize('data, message', [
+    ({'components': [panel('a', left=0, width=100), panel('a', left=0, width=100)]}, 'Duplicate name "a"'),
+    ({'components': [panel('a', left=0, width='a.left / 0')]}, 'Division by zero'),
+    ({'components': [panel('a', left=0, width='10 / a.left')]}, 'Division by a reference'),
+    ({'components': [panel('a', left='a.right', width=10)]}, 'Circular reference'),
+    ({'components': [panel('a', left=0, width=100, depth=10)]}, 'a.depth'),
+    ({'components': [panel('a', left=0, size=100)]}, 'Unknown keys for component "a": size'),
+    ({'components': []}, 'non empty list of components'),
+])
+def test_invalid_files_name_the_problem(data, message):
+    with pytest.raises(LoaderError, match=message):
+        build_components(data)
+
+
+def test_under_defined_components_are_reported_by_axis():
+    a, b = build_components({'components': [panel('a', left=0), panel('b', left='a.right', width=10)]})
+    with pytest.raises(LoaderError, match=r'a\.x is under defined, set 1 more of center_x, right, width'):
+        check_components([a, b])
+    with pytest.raises(LoaderError, match=r'b\.x references an under defined value'):
+        check_components([b])
+
+
+def test_validate_rejects_what_render_cannot_draw(tmp_path, capsys):
+    valid, invalid = tmp_path / 'valid.json', tmp_path / 'invalid.json'
+    valid.write_text(json.dumps({'components': [panel('a', left=0, width=100)]}))
+    entry = panel('a', left=0, width=100)
+    del entry['height']
+    invalid.write_text(json.dumps({'components': [entry]}))
+    assert len(load_components(str(valid))) == 1
+    assert cli.main(['validate', str(valid)]) == 0
+    assert cli.main(['validate', str(invalid)]) == 1
+    assert 'a.z is under defined' in capsys.readouterr().err
@@ -0,0 +1,20 @@
+import pytest
+
+from nesting import GuillotineSheet, MaxRectsSheet, Sheet
+
+
+def test_sheet_is_abstract():
+    with pytest.raises(TypeError):
+        Sheet(100, 100, 18)
+
+
+@pytest.mark.parametrize('sheet_type', [GuillotineSheet, MaxRectsSheet])
+def test_sheets_place_panels_without_overlap(sheet_type):
+    sheet = sheet_type(100, 100, 18, spacing=2)
+    placements = [sheet.insert(index, 20, 30) for index in range(6)]
+    assert all(placements)
+    assert not hasattr(sheet, '__dict__')
+    for index, a in enumerate(placements):
+        assert 0 <= a.x and a.x + a.width <= 100 and 0 <= a.y and a.y + a.height <= 100
+        for b in placements[index + 1:]:
+            assert a.x + a.width <= b.x or b.x + b.width <= a.x or a.y + a.height <= b.y or b.y + b.height <= a.y
@@ -0,0 +1,31 @@
+from Assembly import Assembly
+from Component import Component
+from Pipeline import Pipeline
+
+
+def make(label: str):
+    return Component(label, 4, 'front', left=0, right=100, front=0, bottom=0, height=100)
+
+
+def test_outputs_are_dropped_when_the_assembly_is_solved_elsewhere():
+    a = make('a')
+    assembly = Assembly([a])
+    pipeline = Pipeline(assembly)
+    assert pipeline.bounds[a][2] == (0, 100)
+    a.move_up(50)
+    assembly.get_bounds(a)
+    assert not assembly.dirty
+    assert pipeline.completed == []
+    assert pipeline.bounds[a][2] == (50, 150)
+
+
+def test_stage_reports_only_cover_their_own_stage():
+    from benchmarks.generator import generate_cabinet_row
+    from instrumentation import instrumented
+    with instrumented() as instrumentation, Pipeline(generate_cabinet_row(20, 0)) as pipeline:
+        pipeline.get('fingers')
+        stages = instrumentation.report()['stages']
+    assert list(stages) == ['solve', 'collide', 'joints', 'fingers']
+    assert 'Reference.value' not in stages['fingers']['calls']
+    assert 'intersection_1d.get_intersection_1d' not in stages['fingers']['calls']
+    assert 'Reference.value' not in stages['joints']['calls']
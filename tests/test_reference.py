@@ -0,0 +1,35 @@
+import gc
+import weakref
+
+from Assembly import Assembly
+from Component import Component
+from Parameter import Parameter
+
+
+def build_row(count: int):
+    components = [Component('p0', 18, 'side', left=0, front=0, depth=500, bottom=0, height=2000)]
+    for i in range(1, count):
+        previous = components[-1]
+        components.append(Component(f'p{i}', 18, 'side', left=previous.right + 10, front=previous.front,
+                                    depth=500, bottom=previous.bottom, height=2000))
+    return components
+
+
+def test_references_are_hash_consed():
+    component = Component('c', 18, 'side', left=0, front=0, depth=500, bottom=0, height=2000)
+    spacing = Parameter('spacing', 10)
+    assert component.left is component.left
+    assert spacing.value is spacing.value
+    assert component.right + 10 is component.right + 10
+    assert component.right + spacing.value is component.right + spacing.value
+    assert component.right + 10 is not component.right + 10.0
+
+
+def test_assembly_is_garbage_collected():
+    components = build_row(200)
+    assembly = Assembly(components)
+    assembly.solve()
+    collected = [weakref.ref(assembly), weakref.ref(components[0].left), weakref.ref(components[-1].right + 10)]
+    del components, assembly
+    gc.collect()
+    assert all(reference() is None for reference in collected)
@@ -0,0 +1,36 @@
+from Component import Component
+from SpatialIndex import SpatialIndex
+
+
+def make(label: str, left: float):
+    return Component(label, 4, 'front', left=left, width=100, front=0, bottom=0, height=100)
+
+
+def test_tracked_components_follow_their_edits():
+    a, b = make('a', 0), make('b', 200)
+    b.left = a.right
+    index = SpatialIndex.from_components([a, b])
+    assert index.query_point((150, 2, 50)) == {b}
+    a.move_right(100)
+    assert index.query_point((150, 2, 50)) == {a}
+    assert index.get_bounds(b)[0] == (200, 300)
+
+
+def test_removed_components_stay_removed():
+    a, b = make('a', 0), make('b', 200)
+    b.left = a.right
+    index = SpatialIndex.from_components([a, b])
+    index.remove(b)
+    a.move_right(1)
+    assert index.query_point((150, 2, 50)) == set()
+    assert b not in index
+    index.insert(b, b.full_bounds)
+    assert index.query_point((150, 2, 50)) == {b}
+
+
+def test_closed_index_releases_its_components():
+    a, b = make('a', 0), make('b', 200)
+    with SpatialIndex.from_components([a, b]) as index:
+        assert len(index) == 2
+    assert len(index) == 0
+    assert a._Component__listeners == b._Component__listeners == ()
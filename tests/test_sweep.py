@@ -0,0 +1,32 @@
+import numpy as np
+
+from Component import Component
+from Parameter import Parameter
+from sweep import sweep
+
+
+def test_reference_to_another_axis_of_the_same_component():
+    width = Parameter('width', 100)
+    d = Component('d', 4, 'front', left=0, front=0, bottom=0)
+    d.right = width.value
+    d.height = d.width
+    result = sweep([d], {width: [100, 200]})
+    np.testing.assert_array_equal(result.bounds[:, 0], [[(0, 100), (0, 4), (0, 100)], [(0, 200), (0, 4), (0, 200)]])
+
+
+def build_cabinet(gap):
+    left = Component('left', 18, 'side', left=0, front=0, depth=300, bottom=0, height=500)
+    bottom = Component('bottom', 18, 'top', left=0, right=600, front=0, depth=300, bottom=0)
+    right = Component('right', 18, 'side', right=bottom.right, front=0, depth=300, bottom=0, height=500)
+    right.move_left(gap)
+    return [left, bottom, right]
+
+
+def test_counts_match_scalar_rebuilds():
+    gap = Parameter('gap', 0)
+    gaps = [-20, 0, 570]
+    result = sweep(build_cabinet(gap.value), {gap: gaps})
+    assert result.collision_counts.tolist() == [0, 0, 1]
+    assert result.joint_counts.tolist() == [2, 4, 4]
+    for variant, value in enumerate(gaps):
+        np.testing.assert_array_equal(result.bounds[variant], [c.full_bounds for c in build_cabinet(value)])